@@ -0,0 +1,156 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Connection, Date, cast, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, SQLModel
+
+from database import engine
+from database_models import (
+    DailyCampaignDonations, Donation, Order, OrderDetail, OrderStatusCount, ProductSales,
+)
+
+# Incrementally maintained rollups for the admin dashboard.
+# Every write path that creates, changes or removes donations, orders or
+# order details also applies its delta to the rollup tables in the same
+# transaction, as an upsert that adds to the stored totals. Reads are then
+# a primary-key or small range lookup whatever the size of the history.
+# `rebuild_rollups` recomputes everything from the source tables once, for
+# the initial backfill or to repair drift.
+
+
+def _upsert(model: type[SQLModel], keys: list[str], rows: list[dict]):
+    """INSERT ... ON CONFLICT DO UPDATE that adds each row's values to the stored totals."""
+    dialect_insert = postgresql_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    # A single-row VALUES keeps the compiled statement cacheable
+    statement = dialect_insert(model).values(rows[0] if len(rows) == 1 else rows)
+    columns = model.__table__.c
+    totals = [name for name in rows[0] if name not in keys]
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: columns[name] + statement.excluded[name] for name in totals},
+    )
+
+def _day(column):
+    # SQLite stores dates as ISO text, which date() extracts; other databases cast
+    return func.date(column) if engine.dialect.name == "sqlite" else cast(column, Date)
+
+
+# --- Deltas ---
+# Each returns a statement to execute in the caller's transaction, so the
+# async and sync routes can both use them.
+
+def donation_rollup(campaign_id: int, amount: float, donations: int = 1, day: Optional[date] = None):
+    """Adds (or with negative values, removes) donations to a campaign's daily totals."""
+    day = day or datetime.now(timezone.utc).date()
+    return _upsert(
+        DailyCampaignDonations, ["day", "campaign_id"],
+        [{"day": day, "campaign_id": campaign_id, "amount": amount, "donations": donations}],
+    )
+
+def product_sales_rollup(details: list[dict]):
+    """Adds order lines, given as dicts with product_id, quantity and unit_cost, to product sales."""
+    totals: dict[int, list] = {}
+    for detail in details:
+        total = totals.setdefault(detail["product_id"], [0, 0.0])
+        total[0] += detail["quantity"]
+        total[1] += detail["quantity"] * detail["unit_cost"]
+    return _upsert(
+        ProductSales, ["product_id"],
+        [{"product_id": product_id, "units": units, "revenue": revenue} for product_id, (units, revenue) in totals.items()],
+    )
+
+def order_status_rollup(changes: dict[str, int]):
+    """Applies order count changes per status, e.g. {"Pending": -1, "Shipped": 1}."""
+    return _upsert(
+        OrderStatusCount, ["status"],
+        [{"status": status, "orders": count} for status, count in changes.items()],
+    )
+
+
+# --- Set-Based Updates ---
+
+def subtract_orders(session: Session, *criteria):
+    """Removes the orders matching `criteria` from the rollups. Run it before deleting them."""
+    order_ids = select(Order.id).where(*criteria)
+    sales = session.exec(
+        select(
+            OrderDetail.product_id,
+            -func.sum(OrderDetail.quantity),
+            -func.sum(OrderDetail.quantity * OrderDetail.unit_cost),
+        )
+        .where(OrderDetail.order_id.in_(order_ids))
+        .group_by(OrderDetail.product_id)
+    ).all()
+    if sales:
+        session.exec(_upsert(ProductSales, ["product_id"], [
+            {"product_id": product_id, "units": units, "revenue": revenue} for product_id, units, revenue in sales
+        ]))
+
+    statuses = session.exec(select(Order.status, func.count()).where(*criteria).group_by(Order.status)).all()
+    if statuses:
+        session.exec(order_status_rollup({status: -count for status, count in statuses}))
+
+def subtract_donations(session: Session, *criteria):
+    """Removes the donations matching `criteria` from the daily totals. Run it before deleting them."""
+    days = session.exec(
+        select(_day(Donation.created_at), Donation.campaign_id, -func.sum(Donation.amount), -func.count())
+        # Donations from before created_at existed were never placed on a day
+        .where(*criteria, Donation.created_at.is_not(None))
+        .group_by(_day(Donation.created_at), Donation.campaign_id)
+    ).all()
+    if days:
+        session.exec(_upsert(DailyCampaignDonations, ["day", "campaign_id"], [
+            {"day": _as_date(day), "campaign_id": campaign_id, "amount": amount, "donations": count}
+            for day, campaign_id, amount, count in days
+        ]))
+
+def record_inserted_rows(session: Session, model: type[SQLModel], rows: list[dict]):
+    """Adds rows written outside the routes, e.g. by bulk imports, to the rollups."""
+    if not rows:
+        return
+    if model is OrderDetail:
+        session.exec(product_sales_rollup(rows))
+    elif model is Order:
+        changes: dict[str, int] = {}
+        for row in rows:
+            changes[row["status"]] = changes.get(row["status"], 0) + 1
+        session.exec(order_status_rollup(changes))
+
+def _as_date(value) -> date:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+# --- Rebuild ---
+
+def rebuild_rollups(connection: Connection):
+    """Recomputes every rollup table from the source tables."""
+    for model in (DailyCampaignDonations, ProductSales, OrderStatusCount):
+        connection.execute(delete(model))
+
+    day = _day(Donation.created_at)
+    connection.execute(
+        insert(DailyCampaignDonations).from_select(
+            ["day", "campaign_id", "amount", "donations"],
+            select(day, Donation.campaign_id, func.sum(Donation.amount), func.count())
+            .where(Donation.created_at.is_not(None))
+            .group_by(day, Donation.campaign_id),
+        )
+    )
+    connection.execute(
+        insert(ProductSales).from_select(
+            ["product_id", "units", "revenue"],
+            select(
+                OrderDetail.product_id,
+                func.sum(OrderDetail.quantity),
+                func.sum(OrderDetail.quantity * OrderDetail.unit_cost),
+            ).group_by(OrderDetail.product_id),
+        )
+    )
+    connection.execute(
+        insert(OrderStatusCount).from_select(
+            ["status", "orders"],
+            select(Order.status, func.count()).group_by(Order.status),
+        )
+    )
@@ -0,0 +1,4 @@
+# Benchmark harness for the API hot paths.
+# `python -m benchmarks` seeds a scaled dataset into a temporary database,
+# drives the app in-process and through a local uvicorn server, and compares
+# the latency percentiles against a stored baseline. See __main__.py.
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the API hot paths against a scaled temporary database.",
+    )
+    parser.add_argument("--scale", type=float, default=0.01,
+                        help="Dataset size; 1 seeds 100k products, 1M donations and 500k orders (default 0.01)")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests before each scenario")
+    parser.add_argument("--targets", default="inprocess,uvicorn", help="Comma separated: inprocess, uvicorn")
+    parser.add_argument("--scenarios", default="login,products,fundraising,donation,checkout",
+                        help="Comma separated scenario names")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the uvicorn target")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown before a scenario counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--keep-db", action="store_true", help="Keep the temporary database for inspection")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="weaving-bench-")
+    # The app reads its configuration at import time, so point it at the
+    # temporary database before anything imports `database`
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("DATABASE_PROFILE", "production")
+
+    from benchmarks.dataset import seed_benchmark_database
+    from benchmarks.runner import compare_to_baseline, run_in_process, run_uvicorn
+
+    try:
+        counts = seed_benchmark_database(args.scale)
+        names = args.scenarios.split(",")
+        options = {"requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup}
+
+        results = {}
+        for target in args.targets.split(","):
+            print(f"{target}:")
+            if target == "inprocess":
+                results[target] = asyncio.run(run_in_process(counts, names, **options))
+            elif target == "uvicorn":
+                results[target] = asyncio.run(run_uvicorn(counts, names, args.port, args.workers, **options))
+            else:
+                sys.exit(f"Unknown target '{target}', expected 'inprocess' or 'uvicorn'")
+    finally:
+        if args.keep_db:
+            print(f"Database kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    run = {"scale": args.scale, "concurrency": args.concurrency, "results": results}
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(run, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --save-baseline to store one.")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if (baseline["scale"], baseline["concurrency"]) != (args.scale, args.concurrency):
+        print("Baseline was recorded with a different --scale or --concurrency; skipping the comparison.")
+        return
+
+    regressions = compare_to_baseline(results, baseline["results"], args.tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import random
+import time
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from database import engine
+from database_models import Donation, Fundraising, Order, OrderDetail, Product, ShippingInfo, User
+from migrations import upgrade_database
+from routes.auth import pwd_context
+from seed import seed_database
+
+# Scaled synthetic dataset. Row counts are for --scale 1 and shrink
+# proportionally, so a quick run and a production-sized run share one shape.
+
+FULL_SCALE_ROWS = {
+    "user": 50_000,
+    "product": 100_000,
+    "fundraising": 1_000,
+    "order": 500_000,
+    "donation": 1_000_000,
+}
+INSERT_BATCH_SIZE = 10_000
+# Every Nth synthetic product is archived so the available-products filter has work to do
+ARCHIVED_EVERY = 50
+# Rows the seed command inserts ahead of the synthetic ones
+SEEDED_USERS, SEEDED_CAMPAIGNS, SEEDED_PRODUCTS = 1, 3, 4
+
+BENCH_EMAIL = "bench@weaving.com"
+BENCH_PASSWORD = "benchpass"
+
+
+def _insert_rows(session: Session, model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH_SIZE:
+            session.exec(insert(model), params=batch)
+            batch = []
+    if batch:
+        session.exec(insert(model), params=batch)
+
+def row_counts(scale: float) -> dict[str, int]:
+    return {table: max(1, int(count * scale)) for table, count in FULL_SCALE_ROWS.items()}
+
+def available_product_id(rng: random.Random, counts: dict) -> int:
+    """Picks a synthetic product that isn't archived."""
+    i = rng.randrange(counts["product"])
+    if i % ARCHIVED_EVERY == 0:
+        i = (i + 1) % counts["product"]
+    return SEEDED_PRODUCTS + 1 + i
+
+def seed_benchmark_database(scale: float, seed: int = 42) -> dict[str, int]:
+    """Migrates and fills the database behind DATABASE_URL; returns the row counts."""
+    started = time.perf_counter()
+    upgrade_database(engine)
+    counts = row_counts(scale)
+    rng = random.Random(seed)
+    # Hashing once keeps seeding fast; every synthetic user shares the password
+    hashed_password = pwd_context.hash(BENCH_PASSWORD)
+
+    with Session(engine) as session:
+        seed_database(session)
+        _insert_rows(session, User, (
+            {"email": BENCH_EMAIL if i == 0 else f"user{i}@bench.test", "name": f"Bench User {i}",
+             "hashed_password": hashed_password, "is_admin": False}
+            for i in range(counts["user"])
+        ))
+        _insert_rows(session, Product, (
+            {"name": f"Handwoven Item {i}", "price": round(rng.uniform(50, 10_000), 2),
+             "description": f"Benchmark product {i} woven in the Cordillera.", "image": None,
+             "is_archived": i % ARCHIVED_EVERY == 0}
+            for i in range(counts["product"])
+        ))
+        _insert_rows(session, Fundraising, (
+            {"title": f"Campaign {i}", "goal_amount": 100_000.0, "description": None, "status": "Active",
+             "collected_amount": 0.0, "supporters": 0, "image": None}
+            for i in range(counts["fundraising"])
+        ))
+        session.exec(insert(ShippingInfo), params=[
+            {"shipping_type": "Standard", "shipping_cost": 150.0, "shipping_address": "Baguio City"}
+        ])
+        session.commit()
+
+        user_ids = (SEEDED_USERS + 1, SEEDED_USERS + counts["user"])
+        campaign_ids = (SEEDED_CAMPAIGNS + 1, SEEDED_CAMPAIGNS + counts["fundraising"])
+        product_ids = (SEEDED_PRODUCTS + 1, SEEDED_PRODUCTS + counts["product"])
+        _insert_rows(session, Order, (
+            {"customer_id": rng.randint(*user_ids), "customer_name": "Bench User", "shipping_id": 1,
+             "status": "Pending"}
+            for _ in range(counts["order"])
+        ))
+        _insert_rows(session, OrderDetail, (
+            {"order_id": order_id, "product_id": rng.randint(*product_ids), "product_name": "Handwoven Item",
+             "unit_cost": 500.0, "quantity": rng.randint(1, 3)}
+            for order_id in range(1, counts["order"] + 1)
+        ))
+        _insert_rows(session, Donation, (
+            {"campaign_id": rng.randint(*campaign_ids), "customer_id": rng.randint(*user_ids),
+             "amount": float(rng.choice((100, 250, 500, 1000)))}
+            for _ in range(counts["donation"])
+        ))
+        session.commit()
+
+    print(f"Seeded {sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s: {counts}")
+    return counts
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from benchmarks.dataset import BENCH_EMAIL, BENCH_PASSWORD, available_product_id
+
+# Scenarios and load drivers. A scenario builds one request from a client,
+# the bench user's auth headers and a random generator; the driver keeps
+# `concurrency` requests in flight until `requests` have completed.
+
+UVICORN_STARTUP_TIMEOUT_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    send: Callable[[httpx.AsyncClient, dict, random.Random, dict], Awaitable[httpx.Response]]
+
+
+async def _login(client, headers, rng, counts):
+    return await client.post("/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+
+async def _list_products(client, headers, rng, counts):
+    # Random cursors spread the reads over the table instead of one cached page
+    return await client.get("/products/", params={"after": rng.randint(0, counts["product"])})
+
+async def _list_campaigns(client, headers, rng, counts):
+    return await client.get("/fundraising/")
+
+async def _donate(client, headers, rng, counts):
+    campaign_id = rng.randint(1, counts["fundraising"])
+    return await client.post("/donation/", json={"campaign_id": campaign_id, "amount": 100}, headers=headers)
+
+async def _checkout(client, headers, rng, counts):
+    items = [{"product_id": available_product_id(rng, counts), "quantity": 1} for _ in range(rng.randint(1, 3))]
+    return await client.post("/orders/checkout", headers=headers, json={
+        "items": items,
+        "shipping": {"shipping_type": "Standard", "shipping_address": "Baguio City"},
+        "payment_method": "Cash on Delivery",
+    })
+
+
+SCENARIOS = [
+    Scenario("login", _login),
+    Scenario("products", _list_products),
+    Scenario("fundraising", _list_campaigns),
+    Scenario("donation", _donate),
+    Scenario("checkout", _checkout),
+]
+
+
+# --- Measurement ---
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    counts: dict,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int = 42,
+) -> dict:
+    login = await client.post("/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    rng = random.Random(seed)
+
+    for _ in range(warmup):
+        (await scenario.send(client, headers, rng, counts)).raise_for_status()
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario.send(client, headers, rng, counts)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "throughput_rps": round(requests / elapsed, 1),
+    }
+
+async def run_all(client: httpx.AsyncClient, counts: dict, names: list[str], **options) -> dict:
+    results = {}
+    for scenario in SCENARIOS:
+        if scenario.name in names:
+            results[scenario.name] = await run_scenario(client, scenario, counts, **options)
+            print(f"  {scenario.name:<12} {_format_result(results[scenario.name])}")
+    return results
+
+def _format_result(result: dict) -> str:
+    return (
+        f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+        f"p99 {result['p99_ms']:>8.2f} ms  {result['throughput_rps']:>8.1f} req/s  errors {result['errors']}"
+    )
+
+
+# --- Targets ---
+
+async def run_in_process(counts: dict, names: list[str], **options) -> dict:
+    """Calls the ASGI app directly, measuring the app without network or server overhead."""
+    from main import app, lifespan
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_all(client, counts, names, **options)
+
+async def run_uvicorn(counts: dict, names: list[str], port: int, workers: int, **options) -> dict:
+    """Starts `uvicorn main:app` on localhost and drives it over HTTP."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=options["concurrency"])
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await _wait_until_ready(client, server)
+            return await run_all(client, counts, names, **options)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+async def _wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen):
+    deadline = time.monotonic() + UVICORN_STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            await client.get("/fundraising/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+# --- Baseline ---
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Returns a message for every scenario whose p95 latency grew, or whose
+    throughput dropped, by more than `tolerance` (0.2 means 20%).
+    """
+    regressions = []
+    for target, scenarios in results.items():
+        for name, result in scenarios.items():
+            previous: Optional[dict] = baseline.get(target, {}).get(name)
+            if previous is None:
+                continue
+            if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{target}/{name}: p95 {previous['p95_ms']} ms -> {result['p95_ms']} ms")
+            if result["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+                regressions.append(
+                    f"{target}/{name}: throughput {previous['throughput_rps']} -> {result['throughput_rps']} req/s"
+                )
+    return regressions
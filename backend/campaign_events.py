@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Optional
+
+# Live campaign progress for Server-Sent Events clients.
+# After a donation is committed, its route publishes the campaign's new
+# totals to a broker. Every worker delivers the messages it receives to its
+# own ProgressHub, which fans them out to that worker's open streams.
+#
+# A subscriber holds no queue: it keeps only the latest totals per campaign,
+# and newer totals replace older ones. An idle stream costs one waiting
+# coroutine, and a slow client gets the current figures rather than a
+# backlog. Each event carries absolute totals as well as the change, so a
+# skipped event loses nothing.
+#
+# CAMPAIGN_EVENTS_BROKER=memory delivers within this worker, so it only
+# suits a single uvicorn worker. CAMPAIGN_EVENTS_BROKER=redis relays events
+# through Redis pub/sub, so a donation made through any worker reaches every
+# stream (requires `redis`).
+
+CAMPAIGN_EVENTS_BROKER = os.getenv("CAMPAIGN_EVENTS_BROKER", "memory")
+CAMPAIGN_EVENTS_REDIS_URL = os.getenv("CAMPAIGN_EVENTS_REDIS_URL", "redis://localhost:6379/0")
+# Idle streams get a comment line this often, so proxies don't close them
+CAMPAIGN_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("CAMPAIGN_EVENTS_HEARTBEAT_SECONDS", "15"))
+# Streams end after this long and the browser reconnects. Servers wait for open
+# responses before shutting down, so this also bounds how long a restart takes
+# (or pass uvicorn --timeout-graceful-shutdown).
+CAMPAIGN_EVENTS_MAX_STREAM_SECONDS = float(os.getenv("CAMPAIGN_EVENTS_MAX_STREAM_SECONDS", "300"))
+
+
+class Subscription:
+    """One stream's pending updates; campaign_id None follows every campaign."""
+
+    def __init__(self, campaign_id: Optional[int]):
+        self.campaign_id = campaign_id
+        self.closed = False
+        self._pending: dict[int, dict] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, event: dict):
+        self._pending[event["campaign_id"]] = event
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    async def next_events(self, timeout: float) -> list[dict]:
+        """Waits up to `timeout` seconds for updates; returns [] on timeout or close."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        events = list(self._pending.values())
+        self._pending.clear()
+        return events
+
+
+class ProgressHub:
+    """
+    Fans published events out to this worker's subscriptions. Must only be
+    used from the event loop thread; brokers hand events over with `deliver`.
+    """
+
+    def __init__(self):
+        self._subscriptions: dict[Optional[int], set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def subscribe(self, campaign_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(campaign_id)
+        self._subscriptions.setdefault(campaign_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.campaign_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.campaign_id]
+
+    def dispatch(self, event: dict):
+        # Only the streams for this campaign and the ones following all campaigns
+        for key in (event["campaign_id"], None):
+            for subscription in self._subscriptions.get(key, ()):
+                subscription.push(event)
+
+    def deliver(self, event: dict):
+        """Thread-safe: schedules `dispatch` on the event loop."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.dispatch, event)
+
+    def close(self):
+        """Ends every open stream, so shutdown doesn't wait on idle clients."""
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.close()
+        self._subscriptions.clear()
+
+
+hub = ProgressHub()
+
+
+# --- Brokers ---
+
+class InMemoryBroker:
+    """Delivers events to this worker's hub only."""
+
+    def publish(self, event: dict):
+        hub.deliver(event)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class RedisBroker:
+    """Relays events through a Redis channel so every worker's hub receives them."""
+
+    CHANNEL = "campaign:progress"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CAMPAIGN_EVENTS_BROKER=redis requires the 'redis' package to be installed") from exc
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, event: dict):
+        self._redis.publish(self.CHANNEL, json.dumps(event))
+
+    def _run(self):
+        try:
+            for message in self._pubsub.listen():
+                if message["type"] == "message":
+                    hub.deliver(json.loads(message["data"]))
+        except Exception as exc:  # also raised by `stop` closing the connection
+            if self._pubsub.connection is not None:
+                print(f"Campaign progress listener stopped: {exc}")
+
+    def start(self):
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.CHANNEL)
+        self._thread = threading.Thread(target=self._run, name="campaign-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+def create_broker():
+    if CAMPAIGN_EVENTS_BROKER == "memory":
+        return InMemoryBroker()
+    if CAMPAIGN_EVENTS_BROKER == "redis":
+        return RedisBroker(CAMPAIGN_EVENTS_REDIS_URL)
+    raise ValueError(f"Unknown CAMPAIGN_EVENTS_BROKER '{CAMPAIGN_EVENTS_BROKER}', expected 'memory' or 'redis'")
+
+
+broker = create_broker()
+
+
+# --- Publishing ---
+
+def publish_progress(campaign_id: int, collected_amount: float, supporters: int, amount_change: float):
+    """Announces a campaign's totals after a committed change. Call it after the commit."""
+    event = {
+        "campaign_id": campaign_id,
+        "collected_amount": float(collected_amount),
+        "supporters": supporters,
+        "change": amount_change,
+    }
+    try:
+        broker.publish(event)
+    except Exception as exc:  # the donation is committed; a lost update only delays the UI
+        print(f"Campaign progress publish failed: {exc}")
+
+async def start_campaign_events():
+    hub.bind(asyncio.get_running_loop())
+    broker.start()
+
+def stop_campaign_events():
+    broker.stop()
+    hub.close()
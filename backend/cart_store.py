@@ -0,0 +1,269 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from cache import TTLCache
+from database import engine
+from database_models import Cart
+
+# Per-user cart storage with write-behind to the `cart` table.
+# Cart mutations only touch the store and mark the cart dirty; a background
+# thread persists dirty carts every CART_FLUSH_INTERVAL_SECONDS, so adding or
+# removing items doesn't cost a database commit per click.
+#
+# CART_STORE=memory keeps carts in this worker's memory, which is only
+# consistent when a single worker serves the API. CART_STORE=redis keeps them
+# in a Redis-compatible server shared by every worker (requires `redis`).
+
+CART_STORE = os.getenv("CART_STORE", "memory")
+CART_REDIS_URL = os.getenv("CART_REDIS_URL", "redis://localhost:6379/0")
+CART_FLUSH_INTERVAL_SECONDS = float(os.getenv("CART_FLUSH_INTERVAL_SECONDS", "2"))
+# Flushed carts kept in memory by CART_STORE=memory; older ones reload from the database
+CART_CACHE_SIZE = int(os.getenv("CART_CACHE_SIZE", "10000"))
+CART_CACHE_TTL_SECONDS = float(os.getenv("CART_CACHE_TTL_SECONDS", "1800"))
+
+# A cart maps product_id -> {"quantity": int, "date_added": str}
+CartItems = dict[int, dict]
+# Modifies a cart in place; raising leaves the stored cart unchanged
+Change = Callable[[CartItems], None]
+
+
+def _copy(items: CartItems) -> CartItems:
+    return {product_id: dict(item) for product_id, item in items.items()}
+
+
+class InMemoryCartStore:
+    """
+    Keeps carts in this worker's memory; the local stand-in for a shared cart
+    server. Dirty carts stay pinned until they are flushed, after which they
+    move to a TTL/LRU cache and can be evicted, reloading from the database on
+    the next access.
+    """
+
+    def __init__(self, maxsize: int = CART_CACHE_SIZE, ttl: float = CART_CACHE_TTL_SECONDS):
+        self._clean = TTLCache(maxsize=maxsize, ttl=ttl, name="cart")
+        self._dirty: dict[int, CartItems] = {}
+        self._lock = threading.Lock()
+        # Striped so updates to one cart are serialized without a lock per user
+        self._user_locks = [threading.Lock() for _ in range(64)]
+
+    def _get(self, user_id: int) -> Optional[CartItems]:
+        with self._lock:
+            items = self._dirty.get(user_id)
+            if items is None:
+                items = self._clean.get(user_id)
+            return _copy(items) if items is not None else None
+
+    def _put(self, user_id: int, items: CartItems, dirty: bool):
+        with self._lock:
+            if dirty:
+                self._dirty[user_id] = items
+                self._clean.invalidate(user_id)
+            else:
+                self._clean.set(user_id, items)
+
+    def update(self, user_id: int, load: Callable[[], CartItems], change: Optional[Change] = None) -> CartItems:
+        with self._user_locks[user_id % len(self._user_locks)]:
+            items = self._get(user_id)
+            if items is None:
+                items = load()
+                self._put(user_id, items, dirty=False)
+                items = _copy(items)
+            if change is not None:
+                change(items)
+                self._put(user_id, _copy(items), dirty=True)
+            return items
+
+    def put(self, user_id: int, items: CartItems):
+        with self._user_locks[user_id % len(self._user_locks)]:
+            self._put(user_id, items, dirty=True)
+
+    def restore_dirty(self, dirty: list[tuple[int, CartItems]]):
+        with self._lock:
+            for user_id, items in dirty:
+                # A cart changed since the failed flush is already dirty and newer
+                if user_id not in self._dirty:
+                    self._dirty[user_id] = items
+                    self._clean.invalidate(user_id)
+
+    def drop(self, user_id: int):
+        with self._lock:
+            self._clean.invalidate(user_id)
+            self._dirty.pop(user_id, None)
+
+    def pop_dirty(self) -> list[tuple[int, CartItems]]:
+        with self._lock:
+            dirty = list(self._dirty.items())
+            self._dirty.clear()
+            for user_id, items in dirty:
+                self._clean.set(user_id, items)
+            return dirty
+
+
+class RedisCartStore:
+    """Keeps carts in Redis so every uvicorn worker sees the same cart."""
+
+    DIRTY_KEY = "cart:dirty"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CART_STORE=redis requires the 'redis' package to be installed") from exc
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._watch_error = redis.WatchError
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"cart:{user_id}"
+
+    @staticmethod
+    def _decode(raw: str) -> CartItems:
+        return {int(product_id): item for product_id, item in json.loads(raw).items()}
+
+    def update(self, user_id: int, load: Callable[[], CartItems], change: Optional[Change] = None) -> CartItems:
+        # Optimistic transaction: retried when another worker changes the cart in between
+        key = self._key(user_id)
+        with self._redis.pipeline() as pipeline:
+            while True:
+                try:
+                    pipeline.watch(key)
+                    raw = pipeline.get(key)
+                    items = self._decode(raw) if raw is not None else load()
+                    if change is None and raw is not None:
+                        pipeline.unwatch()
+                        return items
+                    if change is not None:
+                        change(items)
+                    pipeline.multi()
+                    pipeline.set(key, json.dumps(items))
+                    if change is not None:
+                        pipeline.sadd(self.DIRTY_KEY, user_id)
+                    pipeline.execute()
+                    return items
+                except self._watch_error:
+                    continue
+
+    def put(self, user_id: int, items: CartItems):
+        pipeline = self._redis.pipeline()
+        pipeline.set(self._key(user_id), json.dumps(items))
+        pipeline.sadd(self.DIRTY_KEY, user_id)
+        pipeline.execute()
+
+    def restore_dirty(self, dirty: list[tuple[int, CartItems]]):
+        # The carts themselves are still in Redis; only schedule them again
+        if dirty:
+            self._redis.sadd(self.DIRTY_KEY, *(user_id for user_id, _ in dirty))
+
+    def drop(self, user_id: int):
+        pipeline = self._redis.pipeline()
+        pipeline.delete(self._key(user_id))
+        pipeline.srem(self.DIRTY_KEY, user_id)
+        pipeline.execute()
+
+    def pop_dirty(self) -> list[tuple[int, CartItems]]:
+        dirty = []
+        for user_id in self._redis.spop(self.DIRTY_KEY, 1000) or []:
+            raw = self._redis.get(self._key(int(user_id)))
+            dirty.append((int(user_id), self._decode(raw) if raw is not None else {}))
+        return dirty
+
+
+def create_cart_store():
+    if CART_STORE == "memory":
+        return InMemoryCartStore()
+    if CART_STORE == "redis":
+        return RedisCartStore(CART_REDIS_URL)
+    raise ValueError(f"Unknown CART_STORE '{CART_STORE}', expected 'memory' or 'redis'")
+
+
+cart_store = create_cart_store()
+
+
+# --- Cart Access ---
+
+def _load_rows(session: Session, user_id: int) -> CartItems:
+    rows = session.exec(select(Cart).where(Cart.customer_id == user_id)).all()
+    return {row.product_id: {"quantity": row.quantity, "date_added": row.date_added} for row in rows}
+
+def load_cart(session: Session, user_id: int) -> CartItems:
+    """Returns the user's cart, reading it from the `cart` table on a store miss."""
+    return cart_store.update(user_id, lambda: _load_rows(session, user_id))
+
+def update_cart(session: Session, user_id: int, change: Change) -> CartItems:
+    """
+    Applies `change` to the user's cart atomically, so concurrent requests
+    (e.g. a double-clicked add) can't overwrite each other, and schedules the
+    result to be written to the database.
+    """
+    return cart_store.update(user_id, lambda: _load_rows(session, user_id), change)
+
+def save_cart(user_id: int, items: CartItems):
+    """Replaces the cart and schedules it to be written to the database."""
+    cart_store.put(user_id, items)
+
+def now_iso() -> str:
+    return datetime.utcnow().isoformat(timespec="seconds")
+
+
+# --- Write-Behind ---
+
+def flush_dirty_carts() -> int:
+    """Persists every dirty cart, replacing the user's rows in one transaction per flush."""
+    dirty = cart_store.pop_dirty()
+    if not dirty:
+        return 0
+
+    user_ids = [user_id for user_id, _ in dirty]
+    rows = [
+        {"customer_id": user_id, "product_id": product_id, **item}
+        for user_id, items in dirty
+        for product_id, item in items.items()
+    ]
+    try:
+        with Session(engine) as session:
+            session.exec(delete(Cart).where(Cart.customer_id.in_(user_ids)))
+            if rows:
+                session.exec(insert(Cart), params=rows)
+            session.commit()
+    except Exception:
+        # Keep the carts scheduled so the next flush retries them
+        cart_store.restore_dirty(dirty)
+        raise
+    return len(dirty)
+
+
+class CartFlusher:
+    """Background thread that periodically flushes dirty carts."""
+
+    def __init__(self, interval: float = CART_FLUSH_INTERVAL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                flush_dirty_carts()
+            except Exception as exc:  # keep flushing on transient database errors
+                print(f"Cart flush failed: {exc}")
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cart-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the thread and writes any remaining dirty carts."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        flush_dirty_carts()
+
+
+cart_flusher = CartFlusher()
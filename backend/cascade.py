@@ -0,0 +1,78 @@
+from sqlalchemy import case, delete, exists, func, update
+from sqlmodel import Session, select
+
+from cart_store import cart_store
+from database_models import Cart, DailyCampaignDonations, Donation, Fundraising, Order, OrderDetail, Payment, ShippingInfo
+from http_cache import bump_table_version
+from analytics import subtract_donations, subtract_orders
+
+# Set-based deletes of a parent row and everything that belongs to it.
+# Each child table is cleared with one DELETE ... WHERE over an indexed
+# foreign key, so removing a campaign with thousands of donations never loads
+# them into Python. The caller deletes the parent row and commits, keeping the
+# whole cascade in one transaction. Every function returns the number of rows
+# removed per table. The analytics rollups are reduced in the same transaction.
+
+DeleteCounts = dict[str, int]
+
+
+def delete_orders(session: Session, *criteria) -> DeleteCounts:
+    """Deletes the orders matching `criteria` with their details, payments and shipping info."""
+    order_ids = select(Order.id).where(*criteria)
+    # Shipping rows are only linked from the order side, so note them before the orders go
+    shipping_ids = session.exec(select(Order.shipping_id).where(*criteria)).all()
+    subtract_orders(session, *criteria)
+
+    counts = {
+        "orderdetail": session.exec(delete(OrderDetail).where(OrderDetail.order_id.in_(order_ids))).rowcount,
+        "payment": session.exec(delete(Payment).where(Payment.order_id.in_(order_ids))).rowcount,
+        "order": session.exec(delete(Order).where(*criteria)).rowcount,
+        "shippinginfo": 0,
+    }
+    if shipping_ids:
+        # Keep addresses still used by another order
+        counts["shippinginfo"] = session.exec(
+            delete(ShippingInfo).where(
+                ShippingInfo.id.in_(set(shipping_ids)),
+                ~exists().where(Order.shipping_id == ShippingInfo.id),
+            )
+        ).rowcount
+    return counts
+
+def delete_campaign_children(session: Session, campaign_id: int) -> DeleteCounts:
+    """Deletes every donation made to a campaign, along with its daily donation totals."""
+    session.exec(delete(DailyCampaignDonations).where(DailyCampaignDonations.campaign_id == campaign_id))
+    return {"donation": session.exec(delete(Donation).where(Donation.campaign_id == campaign_id)).rowcount}
+
+def delete_user_children(session: Session, user_id: int) -> DeleteCounts:
+    """
+    Deletes a user's orders, donations and saved cart. Campaign totals are
+    reduced by the removed donations, like deleting them one at a time would.
+    """
+    counts = delete_orders(session, Order.customer_id == user_id)
+
+    user_donations = (Donation.campaign_id == Fundraising.id) & (Donation.customer_id == user_id)
+    removed_amount = (
+        select(func.coalesce(func.sum(Donation.amount), 0)).where(user_donations).scalar_subquery()
+    )
+    removed_supporters = select(func.count(Donation.id)).where(user_donations).scalar_subquery()
+    collected_amount = Fundraising.collected_amount - removed_amount
+    supporters = Fundraising.supporters - removed_supporters
+    session.exec(
+        update(Fundraising)
+        .where(Fundraising.id.in_(select(Donation.campaign_id).where(Donation.customer_id == user_id)))
+        .values(
+            collected_amount=case((collected_amount < 0, 0), else_=collected_amount),
+            supporters=case((supporters < 0, 0), else_=supporters),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    subtract_donations(session, Donation.customer_id == user_id)
+    counts["donation"] = session.exec(delete(Donation).where(Donation.customer_id == user_id)).rowcount
+    if counts["donation"]:
+        bump_table_version(session, Fundraising)
+
+    # Drop the cached cart first so the write-behind flush can't write it back
+    cart_store.drop(user_id)
+    counts["cart"] = session.exec(delete(Cart).where(Cart.customer_id == user_id)).rowcount
+    return counts
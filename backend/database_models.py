@@ -1,4 +1,6 @@
+from datetime import date, datetime, timezone
 from typing import Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 from pydantic import EmailStr
 
@@ -54,6 +56,15 @@ class ProductBase(SQLModel):
     is_archived: bool = Field(default=False)     
 
 class Product(ProductBase, table=True):
+    # Partial index covering only the products shown in the marketplace
+    __table_args__ = (
+        Index(
+            "ix_product_available", "id",
+            sqlite_where=text("is_archived = 0"),
+            postgresql_where=text("is_archived = false"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
 
 class ProductCreate(ProductBase):
@@ -62,6 +73,10 @@ class ProductCreate(ProductBase):
 class ProductRead(ProductBase):
     id: int
 
+class ProductSearchResult(ProductRead):
+    snippet: str
+    name_highlight: str
+
 # ------------------------------
 # VIDEOS MODEL
 # ------------------------------
@@ -80,6 +95,10 @@ class VideoCreate(VideoBase):
 class VideoRead(VideoBase):
     id: int
 
+class VideoSearchResult(VideoRead):
+    snippet: str
+    title_highlight: str
+
 # ------------------------------
 # INFOGRAPHICS MODEL
 # ------------------------------
@@ -138,13 +157,15 @@ class ShippingInfoRead(ShippingInfoBase):
     id: int
 
 class OrderBase(SQLModel):
-    customer_id: int
+    customer_id: int = Field(foreign_key="user.id", index=True)
     customer_name: str
     shipping_id: int
     status: str = "Pending"
 
 class Order(OrderBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Lets reports export orders incrementally by date; NULL for orders placed before it existed
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
 
 class OrderCreate(OrderBase):
     pass
@@ -153,7 +174,7 @@ class OrderRead(OrderBase):
     id: int
 
 class OrderDetailBase(SQLModel):
-    order_id: int
+    order_id: int = Field(foreign_key="order.id", index=True)
     product_id: int
     product_name: str
     unit_cost: float
@@ -173,11 +194,13 @@ class OrderDetailRead(OrderDetailBase):
 # ------------------------------
 
 class DonationBase(SQLModel):
-    campaign_id: int 
+    campaign_id: int = Field(foreign_key="fundraising.id", index=True)
     amount: float    
 
 class Donation(DonationBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    customer_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
 
     
 class DonationCreate(DonationBase):
@@ -191,7 +214,7 @@ class DonationRead(DonationBase):
 # ------------------------------
 
 class CartBase(SQLModel):
-    customer_id: int
+    customer_id: int = Field(foreign_key="user.id", index=True)
     product_id: int
     quantity: int
     date_added: str | None = None
@@ -205,12 +228,31 @@ class CartCreate(CartBase):
 class CartRead(CartBase):
     id: int
 
+class CartItemCreate(SQLModel):
+    product_id: int
+    quantity: int = Field(default=1, gt=0)
+
+class CartItemUpdate(SQLModel):
+    quantity: int = Field(ge=0)
+
+class CartItemRead(SQLModel):
+    product_id: int
+    product_name: str
+    unit_cost: float
+    quantity: int
+    subtotal: float
+    date_added: str | None = None
+
+class CartSummary(SQLModel):
+    items: list[CartItemRead]
+    total: float
+
 # ------------------------------
 # PAYMENT MODEL
 # ------------------------------
 
 class PaymentBase(SQLModel):
-    order_id: int
+    order_id: int = Field(foreign_key="order.id", index=True)
     amount: float
     payment_method: str
 
@@ -222,3 +264,86 @@ class PaymentCreate(PaymentBase):
 
 class PaymentRead(PaymentBase):
     id: int
+
+# ------------------------------
+# CHECKOUT MODELS
+# ------------------------------
+
+class CheckoutItem(SQLModel):
+    product_id: int
+    quantity: int = Field(gt=0)
+
+class CheckoutShipping(SQLModel):
+    # The cost is computed by the server from the order subtotal
+    shipping_type: str
+    shipping_address: str
+
+class CheckoutCreate(SQLModel):
+    items: list[CheckoutItem] = Field(min_length=1)
+    shipping: CheckoutShipping
+    payment_method: str
+
+class CheckoutRead(SQLModel):
+    order: OrderRead
+    details: list[OrderDetailRead]
+    shipping: ShippingInfoRead
+    payment: PaymentRead
+
+# ------------------------------
+# MEDIA MODELS
+# ------------------------------
+
+class MediaRead(SQLModel):
+    digest: str
+    original: str
+    # Variant name -> URL of the resized WebP
+    variants: dict[str, str]
+
+# ------------------------------
+# DELETE SUMMARY
+# ------------------------------
+
+class DeleteSummary(SQLModel):
+    detail: str
+    # Rows removed per table, including the deleted row itself
+    deleted: dict[str, int]
+
+# ------------------------------
+# TABLE VERSION MODEL
+# ------------------------------
+
+# One row per cached table, bumped in the same transaction as every write to
+# that table. Shared by all workers, so caches can detect changes made anywhere.
+class TableVersion(SQLModel, table=True):
+    table_name: str = Field(primary_key=True)
+    version: int = 0
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# ------------------------------
+# ANALYTICS ROLLUP MODELS
+# ------------------------------
+
+# Running totals kept up to date by the write paths (see analytics.py), so
+# dashboard figures are single-row or small range reads instead of scans.
+
+class DailyCampaignDonations(SQLModel, table=True):
+    day: date = Field(primary_key=True)
+    campaign_id: int = Field(primary_key=True, index=True)
+    amount: float = 0.0
+    donations: int = 0
+
+class ProductSales(SQLModel, table=True):
+    product_id: int = Field(primary_key=True)
+    units: int = 0
+    revenue: float = Field(default=0.0, index=True)
+
+class OrderStatusCount(SQLModel, table=True):
+    status: str = Field(primary_key=True)
+    orders: int = 0
+
+class ProductSalesRead(SQLModel):
+    product_id: int
+    product_name: Optional[str] = None
+    units: int
+    revenue: float
+
@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import Connection, insert, update
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import async_engine, get_read_session
+from database_models import Fundraising, Infographic, Product, TableVersion, Video
+
+# HTTP caching for the public catalog reads.
+# Every write to a cached table bumps its row in `tableversion` inside the same
+# transaction. ETag and Last-Modified are derived from that version, so
+# browsers and reverse proxies can revalidate with a cheap primary-key lookup
+# and get a 304 instead of a re-serialized listing.
+
+CACHED_TABLES = [Product, Fundraising, Video, Infographic]
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", "30"))
+
+
+# --- Table Versions ---
+
+def ensure_table_versions(connection: Connection):
+    """Creates the version rows for cached tables that don't have one yet."""
+    existing = set(connection.execute(select(TableVersion.table_name)).scalars())
+    missing = [
+        {"table_name": model.__tablename__, "version": 0, "updated_at": datetime.now(timezone.utc)}
+        for model in CACHED_TABLES
+        if model.__tablename__ not in existing
+    ]
+    if missing:
+        connection.execute(insert(TableVersion), missing)
+
+def table_version_bump(model: type[SQLModel]):
+    """
+    Returns the UPDATE that bumps a table's version. Execute it in the same
+    transaction as the write so the version never runs ahead of the data.
+    """
+    return (
+        update(TableVersion)
+        .where(TableVersion.table_name == model.__tablename__)
+        .values(version=TableVersion.version + 1, updated_at=datetime.now(timezone.utc))
+        # No loaded rows to refresh; skips scanning the session's identity map
+        .execution_options(synchronize_session=False)
+    )
+
+def bump_table_version(session: Session, model: type[SQLModel]):
+    session.exec(table_version_bump(model))
+
+# Tables with a post-commit bump waiting to run in this worker
+_queued_bumps: set[str] = set()
+
+def bump_table_version_after_commit(model: type[SQLModel]):
+    """
+    Schedules a version bump in its own short transaction, for a write that
+    has already committed. Writes arriving while a bump is still queued share
+    it, so a burst of donations costs one UPDATE on the version row.
+    """
+    if model.__tablename__ not in _queued_bumps:
+        _queued_bumps.add(model.__tablename__)
+        asyncio.get_running_loop().create_task(_run_queued_bump(model))
+
+async def _run_queued_bump(model: type[SQLModel]):
+    # Dequeue before the UPDATE starts: every write that shared this bump
+    # committed before it, and later writes queue a bump of their own
+    _queued_bumps.discard(model.__tablename__)
+    try:
+        async with AsyncSession(async_engine) as session:
+            await session.exec(table_version_bump(model))
+            await session.commit()
+    except Exception as exc:  # the write is committed; the version catches up on the next bump
+        print(f"Table version bump for {model.__tablename__} failed: {exc}")
+
+
+# --- Conditional Requests ---
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" refer to the same representation
+    return "*" in candidates or etag.removeprefix("W/") in [c.removeprefix("W/") for c in candidates]
+
+def not_modified_since(if_modified_since: str, updated_at: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return updated_at.replace(microsecond=0, tzinfo=timezone.utc) <= since
+
+
+class CatalogCache:
+    """
+    Route dependency for a public, read-mostly table. It adds ETag,
+    Last-Modified and Cache-Control headers and answers matching
+    conditional requests with 304 Not Modified before the route runs.
+    """
+
+    def __init__(self, model: type[SQLModel], max_age: int = CATALOG_CACHE_MAX_AGE):
+        self.table_name = model.__tablename__
+        self.max_age = max_age
+
+    def __call__(self, request: Request, response: Response, session: Session = Depends(get_read_session)):
+        # Read from the same session as the route, so on a replica the version
+        # and the listing come from the same snapshot
+        row = session.get(TableVersion, self.table_name)
+        version = row.version if row else 0
+        # Also used as the key of the in-process listing cache
+        request.state.table_version = version
+
+        # Each URL (path plus filters and cursor) is its own representation
+        url_key = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+        etag = f'W/"{self.table_name}-{version}-{url_key}"'
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+        if row:
+            headers["Last-Modified"] = format_datetime(row.updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, etag)
+        else:
+            not_modified = bool(row and if_modified_since and not_modified_since(if_modified_since, row.updated_at))
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
@@ -5,12 +5,16 @@ from datetime import timedelta
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Centralized database imports
-from database import create_db_and_tables, get_session, engine
+from database import get_async_session, engine, dispose_engines
 
-from database_models import User, UserCreate, UserRead, UserLogin, Token, LoginResponse, Fundraising, Product
-from routes.auth import get_password_hash, verify_password, create_access_token
+from database_models import User, UserCreate, UserRead, UserLogin, Token, LoginResponse
+from routes.auth import get_password_hash_async, verify_and_update_password, create_access_token, invalidate_cached_user
+from pagination import NEXT_CURSOR_HEADER, NEXT_OFFSET_HEADER
+from migrations import AUTO_MIGRATE, check_database, upgrade_database
+from seed import seed_database
 
 # Route Imports
 from routes.products import router as products_router
@@ -20,130 +24,42 @@ from routes.fundraising import router as fundraising_router
 from routes.orders import router as orders_router
 from routes.users import router as users_router 
 from routes.donations import router as donations_router
+from routes.bulk import router as bulk_router
+from routes.cart import router as cart_router
+from routes.media import router as media_router
+from routes.analytics import router as analytics_router
+from cart_store import cart_flusher
+from campaign_events import start_campaign_events, stop_campaign_events
+from write_batch import WRITE_BATCHING, group_committer
+from metrics import METRICS_ENABLED, MetricsMiddleware, router as metrics_router
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# --- INITIAL DATA DEFINITIONS ---
-
-INITIAL_CAMPAIGN_DATA = [
-    {
-        "title": "Emergency Support for Weaver Families",
-        "description": "Help provide immediate assistance to weaver families affected by recent natural disasters in the region.",
-        "collected_amount": 125000, 
-        "goal_amount": 200000,
-        "supporters": 89,
-        "days_left": 15,
-        "image": "https://www.lakwatsero.com/wp-content/uploads/2021/11/Cordillera-Weaves-06.jpg",
-        "is_urgent": True
-    },
-    {
-        "title": "Traditional Loom Restoration Project",
-        "description": "Restore and maintain traditional looms to ensure the continuation of authentic weaving techniques.",
-        "collected_amount": 85000,
-        "goal_amount": 150000,
-        "supporters": 67,
-        "days_left": 28,
-        "image": "https://www.textileschool.com/wp-content/uploads/2025/03/traditional-weavers-working-on-handlooms-in-a-rural-setting.jpg",
-        "is_urgent": False
-    },
-    {
-        "title": "Youth Weaving Education Program",
-        "description": "Fund educational programs to teach traditional weaving skills to the next generation of artisans.",
-        "collected_amount": 45000,
-        "goal_amount": 100000,
-        "supporters": 34,
-        "days_left": 42,
-        "image": "https://www.sapiens.org/app/uploads/2020/08/06_Paulette.Crespillo-Cuison_compressed.jpg",
-        "is_urgent": False
-    }
-]
-
-INITIAL_PRODUCT_DATA = [
-    {
-        "name": "Cordillera Wall Hanging",
-        "price": 595.00,
-        "description": "Handwoven Wall Decor handmade by our Baguio Locals.",
-        "image": "https://files.catbox.moe/yaap40.jpg",
-        "is_archived": False
-    },
-    {
-        "name": "Inabel Super Brocade Twin Blanket",
-        "price": 8107,
-        "description": "Inabel, sometimes referred to as Abel Iloco or simply Abel, is a weaving tradition native to the Ilocano people of Northern Luzon in the Philippines. The textile it produces is sought after in the fashion and interior design industries due to its softness, durability, suitability in tropical climates, and for its austere design patterns.",
-        "image": "https://files.catbox.moe/wnw7it.webp",
-        "is_archived": False
-    },
-    {
-        "name": "Ikat Weave on Bamboo Table Runner - Red",
-        "price": 2313,
-        "description": "These ikat weave bamboo table runners were handcrafted by independent Balinese artisans. Ikat dyeing is a traditional technique that has been passed down through generations. Add these trendy runners to your table for a pop of colour. (Specifications: Handcrafted in Bali, Cotton weave on bamboo, 180 CM L)",
-        "image": "https://files.catbox.moe/hvwfrc.webp",
-        "is_archived": False
-    },
-    {
-        "name": "VMWI1 - Kalinga Infinity Scarf",
-        "price": 3600,
-        "description": "From Makabayan Wear, this is a more modern scarf design using traditional fabric hand woven by the renowned indigenous weavers of kalinga, Philipipnes",
-        "image": "https://files.catbox.moe/wnfxbd.png"
-    }
-]
-
-# --- INITIALIZATION FUNCTIONS ---
-
-def create_initial_admin(session: Session):
-    """Checks for users and creates an initial admin if none exist."""
-    existing_users = session.exec(select(User)).first()
-    if not existing_users:
-        admin_user = User(
-            name="Admin User",
-            email="admin@weaving.com",
-            is_admin=True,
-            hashed_password=get_password_hash("adminpass"),
-            address="Cordillera HQ",
-        )
-        session.add(admin_user)
-        session.commit()
-        print("Initial Admin created.")
-
-def create_initial_campaigns(session: Session):
-    """Inserts initial campaign data if the campaigns table is empty."""
-    existing_campaigns = session.exec(select(Fundraising)).first() 
-    if not existing_campaigns:
-        print("Inserting initial campaign data...")
-        for data in INITIAL_CAMPAIGN_DATA:
-            # Explicitly cast collected_amount/goal_amount to float if not already done
-            campaign = Fundraising(**data) 
-            session.add(campaign)
-        session.commit()
-        print(f"Successfully inserted {len(INITIAL_CAMPAIGN_DATA)} campaigns.")
-
-def create_initial_products(session: Session):
-    """Inserts initial product data if the products table is empty."""
-    existing_products = session.exec(select(Product)).first()
-    if not existing_products:
-        print("Inserting initial product data...")
-        for data in INITIAL_PRODUCT_DATA:
-            product = Product(**data)
-            session.add(product)
-        session.commit()
-        print(f"Successfully inserted {len(INITIAL_PRODUCT_DATA)} products.")
-
 # --- LIFESPAN CONTEXT MANAGER ---
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown events."""
-    print("Initializing database...")
-    create_db_and_tables()
-    
-    # Create a session specifically for the startup event
-    with Session(engine) as session:
-        create_initial_admin(session)
-        create_initial_campaigns(session)
-        create_initial_products(session) # Call the new product initialization
+    if AUTO_MIGRATE:
+        # Only seed a database this startup created; existing ones are left as they are
+        if upgrade_database(engine):
+            with Session(engine) as session:
+                seed_database(session)
+    else:
+        check_database(engine)
+
+    cart_flusher.start()
+    await start_campaign_events()
+    if WRITE_BATCHING:
+        group_committer.start()
     
     yield
     print("Application shutting down...")
+    stop_campaign_events()
+    # Commit queued writes before the engines are disposed
+    group_committer.stop()
+    cart_flusher.stop()
+    await dispose_engines()
 
 # --- FASTAPI APP SETUP ---
 
@@ -161,7 +77,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, NEXT_OFFSET_HEADER],
 )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # --- Include Routers ---
 app.include_router(products_router)
@@ -171,20 +90,26 @@ app.include_router(fundraising_router)
 app.include_router(orders_router)
 app.include_router(users_router)
 app.include_router(donations_router)
+app.include_router(bulk_router)
+app.include_router(cart_router)
+app.include_router(media_router)
+app.include_router(analytics_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 # --- Authentication Endpoints ---
 
 @app.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED, tags=["Auth"])
-def register_user(user_in: UserCreate, session: Session = Depends(get_session)):
+async def register_user(user_in: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """Registers a new Customer user."""
-    existing_user = session.exec(select(User).where(User.email == user_in.email)).first()
+    existing_user = (await session.exec(select(User).where(User.email == user_in.email))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
     
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash_async(user_in.password)
     db_user = User(
         name=user_in.name,
         email=user_in.email,
@@ -195,21 +120,32 @@ def register_user(user_in: UserCreate, session: Session = Depends(get_session)):
     )
     
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
     return db_user
 
 @app.post("/login", response_model=LoginResponse, tags=["Auth"])
-def login_for_access_token(login_data: UserLogin, session: Session = Depends(get_session)):
+async def login_for_access_token(login_data: UserLogin, session: AsyncSession = Depends(get_async_session)):
     """Authenticates user and returns a JWT access token."""
-    user = session.exec(select(User).where(User.email == login_data.email)).first()
-    
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    user = (await session.exec(select(User).where(User.email == login_data.email))).first()
+
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await verify_and_update_password(login_data.password, user.hashed_password)
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Transparently upgrade hashes made with outdated settings
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+        invalidate_cached_user(user.id)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -0,0 +1,124 @@
+import glob
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # uploads are disabled without Pillow
+    Image = None
+
+# Local, content-addressed storage for uploaded images.
+# Originals are stored under their SHA-256 digest, so uploading the same file
+# twice stores it once and its URL never changes meaning. Resized WebP
+# variants are rendered once in a small worker pool and kept next to it,
+# which lets every media URL be cached by browsers as immutable.
+
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "media")
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "http://localhost:8000")
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))
+MEDIA_MAX_UPLOAD_BYTES = int(os.getenv("MEDIA_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+# Variant name -> maximum width in pixels; smaller images are never upscaled
+VARIANTS = {"thumb": 320, "card": 640, "large": 1280}
+WEBP_QUALITY = 80
+# Accepted upload formats and the extension their originals are stored with
+UPLOAD_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+_media_executor = ThreadPoolExecutor(max_workers=MEDIA_WORKERS, thread_name_prefix="media")
+_pending: dict[tuple[str, str], Future] = {}
+_pending_lock = threading.Lock()
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+# --- Paths and URLs ---
+
+def is_digest(value: str) -> bool:
+    return len(value) == 64 and all(char in "0123456789abcdef" for char in value)
+
+def original_path(digest: str) -> Optional[str]:
+    matches = glob.glob(os.path.join(MEDIA_ROOT, "originals", f"{digest}.*"))
+    return matches[0] if matches else None
+
+def variant_path(digest: str, name: str) -> str:
+    return os.path.join(MEDIA_ROOT, "variants", digest, f"{name}.webp")
+
+def original_url(digest: str) -> str:
+    return f"{MEDIA_BASE_URL}/media/{digest}"
+
+def variant_url(digest: str, name: str) -> str:
+    return f"{MEDIA_BASE_URL}/media/{digest}/{name}.webp"
+
+def _write_atomically(path: str, data: bytes):
+    # Readers never see a half-written file under the final name
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+# --- Originals ---
+
+def store_original(data: bytes) -> str:
+    """Validates an uploaded image and stores it under its digest; returns the digest."""
+    if Image is None:
+        raise RuntimeError("Image uploads require the 'Pillow' package to be installed")
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format = image.format
+            image.verify()
+    except Exception as exc:
+        raise InvalidImage("The file is not a readable image") from exc
+    if image_format not in UPLOAD_FORMATS:
+        raise InvalidImage(f"Unsupported image format, expected one of {', '.join(UPLOAD_FORMATS)}")
+
+    digest = hashlib.sha256(data).hexdigest()
+    if original_path(digest) is None:
+        path = os.path.join(MEDIA_ROOT, "originals", f"{digest}.{UPLOAD_FORMATS[image_format]}")
+        _write_atomically(path, data)
+    return digest
+
+
+# --- Variants ---
+
+def _render_variant(digest: str, name: str):
+    with Image.open(original_path(digest)) as image:
+        # Phone photos store their rotation in EXIF; bake it in before resizing
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        image.thumbnail((VARIANTS[name], VARIANTS[name] * 4), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, "WEBP", quality=WEBP_QUALITY, method=4)
+    _write_atomically(variant_path(digest, name), output.getvalue())
+
+def render_variant(digest: str, name: str) -> Optional[Future]:
+    """
+    Schedules a variant on the worker pool unless it already exists.
+    Concurrent callers share the same job; returns None when there's nothing to do.
+    """
+    if os.path.exists(variant_path(digest, name)):
+        return None
+    key = (digest, name)
+    with _pending_lock:
+        future = _pending.get(key)
+        if future is not None:
+            return future
+        future = _pending[key] = _media_executor.submit(_render_variant, digest, name)
+    # Outside the lock: the callback runs right away if the job already finished
+    future.add_done_callback(lambda _: _forget(key))
+    return future
+
+def _forget(key: tuple[str, str]):
+    with _pending_lock:
+        _pending.pop(key, None)
+
+def render_all_variants(digest: str):
+    for name in VARIANTS:
+        render_variant(digest, name)
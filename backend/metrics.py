@@ -0,0 +1,242 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import APIRouter, Response
+from sqlalchemy import Engine, event
+
+from cache import CACHES
+
+# Request and database instrumentation exposed in Prometheus text format.
+# The middleware times every request by route template and collects the
+# number and total duration of the SQL statements it ran, so handlers with
+# N+1 query patterns or that are bound on the database stand out on /metrics.
+# The hit and miss counts of the in-process caches are reported alongside.
+# Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their route.
+#
+# Each uvicorn worker keeps its own counters; scrape every worker or run a
+# single one behind the scraper.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+# Longest statement text written to the slow-query log
+SLOW_QUERY_LOG_CHARS = 500
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_logger = logging.getLogger("weaving.slow_query")
+
+
+# --- Metric Types ---
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}_total{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label values -> (count per bucket, observation count, sum)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            for label_values, (bucket_counts, count, total) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    labels = _format_labels(names, label_values + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(names, label_values + ('+Inf',))} {count}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+        return lines
+
+
+class CacheStats:
+    """Reads the hit, miss and size counts of every named TTLCache at scrape time."""
+
+    def render(self) -> list[str]:
+        lines = []
+        for name, documentation, kind, value in (
+            ("cache_hits", "Lookups served from an in-process cache.", "counter", lambda cache: cache.hits),
+            ("cache_misses", "Lookups that missed an in-process cache (including expired entries).", "counter", lambda cache: cache.misses),
+            ("cache_entries", "Entries currently held by an in-process cache.", "gauge", len),
+        ):
+            sample = f"{name}_total" if kind == "counter" else name
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            for cache_name, cache in sorted(CACHES.items()):
+                lines.append(f"{sample}{_format_labels(('cache',), (cache_name,))} {value(cache)}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status")
+)
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+request_db_time = Histogram(
+    "http_request_db_seconds", "Cumulative SQL execution time per request.", ("method", "route")
+)
+slow_queries = Counter(
+    "db_slow_queries", f"SQL statements slower than {SLOW_QUERY_THRESHOLD_MS:g} ms.", ("route",)
+)
+REGISTRY = [request_duration, request_queries, request_db_time, slow_queries, CacheStats()]
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- SQL Statement Tracking ---
+
+class RequestStats:
+    """SQL statements seen while serving one request."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def route(self) -> str:
+        # The router fills in scope["route"] before the endpoint runs
+        return _route_template(self.scope)
+
+    def add_query(self, seconds: float):
+        # Sync routes and background threads of the same request share this object
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.add_query(elapsed)
+
+    if elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        route = stats.route if stats is not None else "background"
+        slow_queries.inc(route)
+        slow_query_logger.warning(
+            "Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, statement[:SLOW_QUERY_LOG_CHARS]
+        )
+
+def _discard_query_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+# With metrics off, queries skip the timing hooks entirely
+if METRICS_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _start_query_timer)
+    event.listen(Engine, "after_cursor_execute", _record_query)
+    event.listen(Engine, "handle_error", _discard_query_timer)
+
+
+# --- Middleware ---
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, SQL count and SQL time per route.
+    Timing ends when the response body has been sent, so streamed exports
+    are measured in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request.reset(token)
+            elapsed = time.perf_counter() - start
+            method = scope["method"]
+            route = stats.route
+            request_duration.observe(elapsed, method, route, str(status_code))
+            request_queries.observe(stats.queries, method, route)
+            request_db_time.observe(stats.db_seconds, method, route)
+
+def _route_template(scope) -> str:
+    # Templates such as /products/{product_id} keep the label count bounded
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4")
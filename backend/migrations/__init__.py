@@ -0,0 +1,104 @@
+import importlib
+import os
+import pkgutil
+
+from sqlalchemy import Connection, Engine, inspect, text
+from sqlalchemy.exc import DatabaseError
+from sqlmodel import SQLModel
+
+import database_models  # noqa: F401  registers every table on SQLModel.metadata
+
+# Versioned schema migrations.
+# Each `mNNNN_*.py` module in this package exposes `upgrade(connection)` and
+# is applied once, in order, inside its own transaction. The number of the
+# last applied migration is kept in the single-row `schema_version` table, so
+# a worker starting against a current database does one primary-key read and
+# nothing else.
+#
+# Run `python -m migrations` once per deploy when several workers share a
+# database, and set AUTO_MIGRATE=0 so workers only check the version.
+
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1").lower() in ("1", "true")
+
+
+def discover_migrations() -> list[tuple[int, str]]:
+    """Returns (version, module name) for every migration, oldest first."""
+    migrations = []
+    for module in pkgutil.iter_modules(__path__):
+        if module.name.startswith("m") and module.name[1:5].isdigit():
+            migrations.append((int(module.name[1:5]), module.name))
+    return sorted(migrations)
+
+def latest_version() -> int:
+    migrations = discover_migrations()
+    return migrations[-1][0] if migrations else 0
+
+
+# --- Version Table ---
+
+def _ensure_version_table(connection: Connection):
+    connection.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    connection.execute(text(
+        "INSERT INTO schema_version (version) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM schema_version)"
+    ))
+
+def current_version(connection: Connection) -> int:
+    return connection.execute(text("SELECT version FROM schema_version")).scalar_one()
+
+def _lock_and_read_version(connection: Connection) -> int:
+    # Taking the write lock first makes concurrent runners apply each migration once
+    connection.execute(text("UPDATE schema_version SET version = version"))
+    return current_version(connection)
+
+def _has_application_tables(connection: Connection) -> bool:
+    existing = set(inspect(connection).get_table_names())
+    return any(table in existing for table in SQLModel.metadata.tables)
+
+
+# --- Runner ---
+
+def upgrade_database(engine: Engine) -> bool:
+    """
+    Brings the database up to the latest migration.
+    Returns True when it created the schema from scratch, so the caller knows
+    the database is new and may want to seed it.
+    """
+    target = latest_version()
+    with engine.connect() as connection:
+        try:
+            if current_version(connection) >= target:
+                return False
+        except DatabaseError:
+            # No version table yet: a new database or one made by create_all
+            connection.rollback()
+
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        version = _lock_and_read_version(connection)
+        created = version == 0 and not _has_application_tables(connection)
+        if version == 0:
+            # Baseline: create every table of the current models. Existing
+            # databases keep their tables and get the rest from migrations.
+            SQLModel.metadata.create_all(connection)
+
+    for number, name in discover_migrations():
+        with engine.begin() as connection:
+            if _lock_and_read_version(connection) >= number:
+                continue
+            print(f"Applying migration {name}...")
+            importlib.import_module(f"{__name__}.{name}").upgrade(connection)
+            connection.execute(text("UPDATE schema_version SET version = :version"), {"version": number})
+    return created
+
+def check_database(engine: Engine):
+    """Fails fast when a worker starts against a database that wasn't migrated."""
+    with engine.connect() as connection:
+        try:
+            version = current_version(connection)
+        except DatabaseError:
+            version = 0
+    if version < latest_version():
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {latest_version()}. "
+            "Run `python -m migrations` first."
+        )
@@ -0,0 +1,10 @@
+from database import engine
+from migrations import current_version, upgrade_database
+
+if __name__ == "__main__":
+    created = upgrade_database(engine)
+    with engine.connect() as connection:
+        version = current_version(connection)
+    print(f"Database schema is at version {version}.")
+    if created:
+        print("New database created; run `python seed.py` to add the initial data.")
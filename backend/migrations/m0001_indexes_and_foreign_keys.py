@@ -0,0 +1,71 @@
+from sqlalchemy import Connection, MetaData, inspect, text
+from sqlalchemy.schema import AddConstraint
+from sqlmodel import SQLModel
+
+from database_models import Cart, Donation, Order, OrderDetail, Payment, Product
+
+# Adds the foreign keys and indexes on order, orderdetail, donation, cart and
+# payment, the donation.customer_id column, and the partial index on
+# non-archived products. New databases get all of this from create_all.
+
+CHANGED_TABLES = [Order, OrderDetail, Donation, Cart, Payment]
+
+
+def _rebuild_sqlite_table(connection: Connection, table):
+    """
+    SQLite can't add foreign keys to an existing table, so the table is
+    recreated from the model under a temporary name, filled from the old
+    one, and renamed into place.
+    """
+    metadata = MetaData()
+    for source in SQLModel.metadata.sorted_tables:
+        source.to_metadata(metadata)
+    new_name = f"{table.name}__new"
+    new_table = table.to_metadata(metadata, name=new_name)
+    # Indexes are created under their real names once the table is renamed
+    new_table.indexes.clear()
+    new_table.create(connection)
+
+    old_columns = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    columns = ", ".join(f'"{column.name}"' for column in table.columns if column.name in old_columns)
+    connection.execute(text(f'INSERT INTO "{new_name}" ({columns}) SELECT {columns} FROM "{table.name}"'))
+    connection.execute(text(f'DROP TABLE "{table.name}"'))
+    connection.execute(text(f'ALTER TABLE "{new_name}" RENAME TO "{table.name}"'))
+    for index in table.indexes:
+        index.create(connection)
+
+
+def _upgrade_table(connection: Connection, table):
+    inspector = inspect(connection)
+    if not inspector.has_table(table.name):
+        table.create(connection)
+        return
+
+    if connection.dialect.name == "sqlite":
+        if not inspector.get_foreign_keys(table.name):
+            _rebuild_sqlite_table(connection, table)
+        return
+
+    existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in existing_columns:
+            column_type = column.type.compile(connection.dialect)
+            connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+    if not inspector.get_foreign_keys(table.name):
+        for constraint in table.foreign_key_constraints:
+            connection.execute(AddConstraint(constraint))
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def upgrade(connection: Connection):
+    for model in CHANGED_TABLES:
+        _upgrade_table(connection, model.__table__)
+    for index in Product.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+    if connection.dialect.name == "sqlite":
+        orphans = connection.execute(text("PRAGMA foreign_key_check")).all()
+        if orphans:
+            print(f"Warning: {len(orphans)} existing rows reference missing parent rows.")
+
@@ -0,0 +1,13 @@
+from sqlalchemy import Connection
+
+from http_cache import ensure_table_versions
+from search import ensure_search_indexes
+
+# Adds the catalog version rows used for ETags and the listing cache, and the
+# FTS5 search tables with their sync triggers. Both used to be checked on
+# every startup.
+
+
+def upgrade(connection: Connection):
+    ensure_table_versions(connection)
+    ensure_search_indexes(connection)
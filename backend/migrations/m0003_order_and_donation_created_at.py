@@ -0,0 +1,20 @@
+from sqlalchemy import Connection, inspect, text
+
+from database_models import Donation, Order
+
+# Adds the indexed created_at column used by the date range filters of the
+# order and donation exports. Existing rows keep a NULL date.
+
+CHANGED_TABLES = [Order, Donation]
+
+
+def upgrade(connection: Connection):
+    inspector = inspect(connection)
+    for model in CHANGED_TABLES:
+        table = model.__table__
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        if "created_at" not in existing_columns:
+            column_type = table.c.created_at.type.compile(connection.dialect)
+            connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN created_at {column_type}'))
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
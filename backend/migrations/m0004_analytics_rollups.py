@@ -0,0 +1,16 @@
+from sqlalchemy import Connection
+
+from analytics import rebuild_rollups
+from database_models import DailyCampaignDonations, OrderStatusCount, ProductSales
+
+# Creates the analytics rollup tables and backfills them from the existing
+# donations, orders and order details. Donations from before created_at was
+# added have no day and are left out of the daily totals.
+
+ROLLUP_TABLES = [DailyCampaignDonations, ProductSales, OrderStatusCount]
+
+
+def upgrade(connection: Connection):
+    for model in ROLLUP_TABLES:
+        model.__table__.create(connection, checkfirst=True)
+    rebuild_rollups(connection)
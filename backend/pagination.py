@@ -0,0 +1,141 @@
+import json
+from datetime import date
+from typing import Any, Optional, Type
+
+from fastapi import HTTPException, Query, Response
+from sqlmodel import Session, SQLModel, select
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same JSON, only slower
+    orjson = None
+
+# Shared keyset pagination and sparse field selection for the list endpoints.
+# Pages are ordered by primary key, so the cost of a page does not grow
+# with how deep into the table the client has scrolled.
+#
+# List endpoints can opt into a fast path that selects the read model's
+# columns as plain rows and encodes them straight to JSON, skipping ORM
+# hydration and per-row Pydantic validation. The wire format is the same as
+# the response_model's, as long as the read model only has plain column fields.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Ranked results (e.g. search) can't use an id cursor and page by offset instead
+NEXT_OFFSET_HEADER = "X-Next-Offset"
+
+
+def _json_default(value: Any):
+    # Match orjson, which writes dates and datetimes in ISO 8601
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson when it is installed."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def read_columns(model: Type[SQLModel], read_model: Type[SQLModel]):
+    """The table columns behind every field of `read_model`, in field order."""
+    return [getattr(model, name) for name in read_model.model_fields]
+
+def rows_response(rows, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Encodes rows selected with `read_columns` (or any column select) as a JSON list."""
+    return FastJSONResponse([row._asdict() for row in rows], headers=headers)
+
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[int] = Query(None, ge=0, description="Return rows with an id greater than this cursor"),
+        fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+
+
+def _projected_columns(model: Type[SQLModel], read_model: Type[SQLModel], fields: str):
+    """Maps a `fields=` value onto table columns, always keeping the id cursor."""
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in read_model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    names = ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+    return [getattr(model, name) for name in names]
+
+
+def paginate(
+    session: Session,
+    model: Type[SQLModel],
+    read_model: Type[SQLModel],
+    page: PageParams,
+    response: Response,
+    *filters,
+    fast: bool = False,
+):
+    """
+    Runs a keyset-paginated query for `model`.
+    When more rows are available, the id to pass as `after` for the next page
+    is returned in the X-Next-Cursor header. With `fields=` only the requested
+    columns are selected and the rows are returned as plain JSON objects;
+    `fast=True` does the same with every field of `read_model`.
+    """
+    if page.fields:
+        columns = _projected_columns(model, read_model, page.fields)
+    elif fast:
+        columns = read_columns(model, read_model)
+    else:
+        columns = None
+    statement = select(*columns) if columns else select(model)
+
+    for clause in filters:
+        statement = statement.where(clause)
+    if page.after is not None:
+        statement = statement.where(model.id > page.after)
+
+    # Fetch one extra row to know whether another page exists
+    statement = statement.order_by(model.id).limit(page.limit + 1)
+    rows = session.exec(statement).all()
+
+    headers = {}
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+
+    if columns:
+        # Keep headers other dependencies set on the injected response (e.g. caching)
+        return rows_response(rows, headers={**response.headers, **headers})
+
+    response.headers.update(headers)
+    return rows
+
+
+class SearchParams:
+    """Query parameters shared by the ranked search endpoints."""
+
+    def __init__(
+        self,
+        q: str = Query(..., min_length=1, max_length=200),
+        limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+        offset: int = Query(0, ge=0),
+    ):
+        self.q = q
+        self.limit = limit
+        self.offset = offset
@@ -0,0 +1,73 @@
+import os
+from functools import lru_cache
+from typing import Callable
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlmodel import SQLModel
+
+from cache import TTLCache
+from database_models import Fundraising, Product
+from pagination import NEXT_CURSOR_HEADER
+
+# Read-through cache of serialized JSON bodies for the hottest listings.
+# A hit skips the query, SQLModel hydration and Pydantic validation entirely.
+#
+# Entries are keyed by the table version that CatalogCache read from the
+# shared `tableversion` table, so a write made through any uvicorn worker
+# makes every worker miss on its next request. Writes handled by this worker
+# also clear its entries right away to release memory.
+
+LISTING_CACHE_SIZE = int(os.getenv("LISTING_CACHE_SIZE", "256"))
+LISTING_CACHE_TTL_SECONDS = float(os.getenv("LISTING_CACHE_TTL_SECONDS", "300"))
+
+listing_caches = {
+    model.__tablename__: TTLCache(
+        maxsize=LISTING_CACHE_SIZE, ttl=LISTING_CACHE_TTL_SECONDS, name=f"{model.__tablename__}_listing"
+    )
+    for model in (Product, Fundraising)
+}
+
+@lru_cache
+def _list_adapter(read_model: type[SQLModel]) -> TypeAdapter:
+    return TypeAdapter(list[read_model])
+
+def invalidate_listing_cache(model: type[SQLModel]):
+    """Drops this worker's cached listings for a table after a write."""
+    cache = listing_caches.get(model.__tablename__)
+    if cache is not None:
+        cache.clear()
+
+def cached_listing(
+    request: Request,
+    response: Response,
+    model: type[SQLModel],
+    read_model: type[SQLModel],
+    build: Callable[[], object],
+) -> Response:
+    """
+    Returns the cached JSON body for this URL, or runs `build` (which returns
+    rows or a ready JSON Response, like `paginate`) and caches its output.
+    Must run after the table's CatalogCache dependency.
+    """
+    cache = listing_caches[model.__tablename__]
+    key = (request.state.table_version, request.url.path, request.url.query)
+
+    entry = cache.get(key)
+    cache_status = "HIT"
+    if entry is None:
+        cache_status = "MISS"
+        result = build()
+        if isinstance(result, Response):
+            entry = (result.body, result.headers.get(NEXT_CURSOR_HEADER))
+        else:
+            adapter = _list_adapter(read_model)
+            body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+            entry = (body, response.headers.get(NEXT_CURSOR_HEADER))
+        cache.set(key, entry)
+
+    body, next_cursor = entry
+    headers = {**response.headers, "X-Cache": cache_status}
+    if next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,66 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select
+
+from database import get_read_session, get_session
+from database_models import DailyCampaignDonations, OrderStatusCount, Product, ProductSales, ProductSalesRead
+from routes.auth import get_current_admin_user_sync
+from analytics import rebuild_rollups
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get("/donations/daily", response_model=list[DailyCampaignDonations])
+def daily_donations(
+    campaign_id: Optional[int] = None,
+    date_from: Optional[date] = Query(None, alias="from", description="First day to include"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day to include"),
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin_user_sync),
+):
+    """Donation totals per campaign and day, oldest first (Admin only)."""
+    statement = select(DailyCampaignDonations)
+    if campaign_id is not None:
+        statement = statement.where(DailyCampaignDonations.campaign_id == campaign_id)
+    if date_from is not None:
+        statement = statement.where(DailyCampaignDonations.day >= date_from)
+    if date_to is not None:
+        statement = statement.where(DailyCampaignDonations.day <= date_to)
+    statement = statement.order_by(DailyCampaignDonations.day, DailyCampaignDonations.campaign_id)
+    return session.exec(statement).all()
+
+@router.get("/products", response_model=list[ProductSalesRead])
+def top_products(
+    limit: int = Query(10, ge=1, le=100),
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin_user_sync),
+):
+    """The best-selling products by revenue (Admin only)."""
+    statement = (
+        select(ProductSales.product_id, Product.name, ProductSales.units, ProductSales.revenue)
+        # Sales of deleted products are still counted, just without a name
+        .outerjoin(Product, Product.id == ProductSales.product_id)
+        .where(ProductSales.units > 0)
+        .order_by(ProductSales.revenue.desc())
+        .limit(limit)
+    )
+    return [
+        ProductSalesRead(product_id=product_id, product_name=name, units=units, revenue=revenue)
+        for product_id, name, units, revenue in session.exec(statement).all()
+    ]
+
+@router.get("/orders/status", response_model=dict[str, int])
+def orders_by_status(session: Session = Depends(get_read_session), admin=Depends(get_current_admin_user_sync)):
+    """Number of orders in each status (Admin only)."""
+    counts = session.exec(select(OrderStatusCount.status, OrderStatusCount.orders)).all()
+    # Statuses whose orders have all moved on keep a zero row
+    return {status: orders for status, orders in counts if orders}
+
+@router.post("/rebuild")
+def rebuild(session: Session = Depends(get_session), admin=Depends(get_current_admin_user_sync)):
+    """Recomputes the rollups from the source tables, e.g. after editing data by hand (Admin only)."""
+    rebuild_rollups(session.connection())
+    session.commit()
+    return {"detail": "Analytics rollups rebuilt"}
@@ -1,14 +1,20 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Centralized imports for database and models
-from database import get_session
+from cache import TTLCache
+from database import engine, get_async_session
 from database_models import TokenData, User
 
 # --- Security Configuration ---
@@ -16,19 +22,81 @@ SECRET_KEY = "123456asdfg"  # CHANGE THIS IN PRODUCTION
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Changing BCRYPT_ROUNDS makes existing hashes "need update"; they are
+# transparently rehashed with the new cost on the user's next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# --- Authenticated User Cache ---
+# When enabled, the `user_id` claim of a verified token is used to look the
+# user up by primary key through a per-worker TTL/LRU cache, so most
+# authenticated requests skip the database entirely. The TTL bounds how long
+# another worker can serve a stale entry after an update or delete. Ids can be
+# reused after a delete, so the loaded user must still match the token's email.
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "0") == "1"
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS, name="user")
+
+def invalidate_cached_user(user_id: int):
+    """Drops a user from the auth cache after it was changed or deleted."""
+    user_cache.invalidate(user_id)
+
+# --- Password Hashing Pool ---
+# bcrypt is CPU bound, so the request path hashes and verifies through a
+# small dedicated pool instead of running on the event loop or hogging the
+# request threadpool. bcrypt releases the GIL, so threads give real
+# parallelism here. At most PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING
+# operations are admitted at once; beyond that callers get a 503 and should
+# retry, which keeps latency predictable during login storms instead of
+# letting the queue grow unbounded.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING)
+
+def _submit_hash_job(fn, *args) -> Future:
+    """Queues a passlib call on the hashing pool, rejecting it when the pool is saturated."""
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests, please retry",
+            headers={"Retry-After": "1"},
+        )
+    future = _hash_executor.submit(fn, *args)
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
 # --- Password Hashing Functions ---
+# The sync variants hash on the calling thread, outside the pool and its 503,
+# for scripts such as seed.py and the admin-only sync routes, which already
+# run in the request threadpool.
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifies a plain password against a hash."""
+    """Verifies a plain password against a hash on the calling thread."""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hashes a plain password."""
+    """Hashes a plain password on the calling thread."""
     return pwd_context.hash(password)
 
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password without blocking the event loop.
+    Also returns a replacement hash when the stored one was made with
+    outdated settings (e.g. a lower bcrypt cost), otherwise None.
+    """
+    future = _submit_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+    return await asyncio.wrap_future(future)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hashes a plain password without blocking the event loop."""
+    return await asyncio.wrap_future(_submit_hash_job(pwd_context.hash, password))
+
 # --- JWT Token Functions ---
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -44,49 +112,87 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 # --- Dependency to get the current authenticated user ---
+# Async routes use get_current_user, which shares the route's AsyncSession.
+# Sync routes use get_current_user_sync, which looks the user up on the sync
+# engine in a short session of its own, so a request never holds an async
+# and a sync pooled connection at the same time.
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), 
-    session: Session = Depends(get_session)
-) -> User:
-    """
-    Decodes the JWT token, validates its data, and fetches the corresponding
-    user from the database.
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> Tuple[TokenData, Optional[int]]:
+    """Returns the verified token's claims and its `user_id`, if any."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        is_admin: bool = payload.get("is_admin", False)
-        
-        if email is None:
-            raise credentials_exception
-        
-        token_data = TokenData(email=email, is_admin=is_admin)
-
     except JWTError:
-        raise credentials_exception
-        
-    # Fetch the user from the database to ensure they exist
-    user = session.exec(select(User).where(User.email == token_data.email)).first()
-    if user is None:
-        raise credentials_exception
-        
-    return user
+        raise _credentials_exception()
+    email = payload.get("sub")
+    if email is None:
+        raise _credentials_exception()
+    user_id = payload.get("user_id")
+    token_data = TokenData(email=email, is_admin=payload.get("is_admin", False))
+    return token_data, user_id if AUTH_TRUST_TOKEN_CLAIMS and isinstance(user_id, int) else None
 
+def _authenticated(user: Optional[User], token_data: TokenData) -> User:
+    # A token for a deleted user must not log in as whoever got its id next
+    if user is None or user.email != token_data.email:
+        raise _credentials_exception()
+    return user
 
-# Dependency to check for admin role
-async def get_current_admin_user(current_user: User = Depends(get_current_user)):
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), 
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
     """
-    Dependency that ensures the current user is an administrator.
+    Decodes the JWT token, validates its data, and fetches the corresponding
+    user, from the user cache when token claims are trusted or from the
+    database otherwise.
     """
+    token_data, user_id = _decode_token(token)
+    if user_id is not None:
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await session.get(User, user_id)
+            if user is not None:
+                user_cache.set(user_id, user)
+    else:
+        user = (await session.exec(select(User).where(User.email == token_data.email))).first()
+    return _authenticated(user, token_data)
+
+def get_current_user_sync(token: str = Depends(oauth2_scheme)) -> User:
+    """`get_current_user` for sync routes."""
+    token_data, user_id = _decode_token(token)
+    user = user_cache.get(user_id) if user_id is not None else None
+    if user is None:
+        with Session(engine) as session:
+            if user_id is not None:
+                user = session.get(User, user_id)
+                if user is not None:
+                    user_cache.set(user_id, user)
+            else:
+                user = session.exec(select(User).where(User.email == token_data.email)).first()
+    return _authenticated(user, token_data)
+
+
+# Dependencies to check for admin role
+def _require_admin(current_user: User) -> User:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Operation requires admin privileges",
         )
     return current_user
+
+async def get_current_admin_user(current_user: User = Depends(get_current_user)):
+    """
+    Dependency that ensures the current user is an administrator.
+    """
+    return _require_admin(current_user)
+
+def get_current_admin_user_sync(current_user: User = Depends(get_current_user_sync)):
+    """`get_current_admin_user` for sync routes."""
+    return _require_admin(current_user)
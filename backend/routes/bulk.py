@@ -0,0 +1,281 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from database import engine, get_read_engine
+from database_models import (
+    Donation, DonationCreate, DonationRead,
+    Order, OrderCreate, OrderRead,
+    OrderDetail, OrderDetailCreate, OrderDetailRead,
+    Product, ProductCreate, ProductRead,
+)
+from routes.auth import get_current_admin_user, get_current_admin_user_sync
+from http_cache import CACHED_TABLES, bump_table_version
+from pagination import dumps
+from response_cache import invalidate_listing_cache
+from analytics import record_inserted_rows
+
+router = APIRouter(prefix="/bulk", tags=["Bulk"])
+
+# Tables that can be bulk imported and exported: (table model, input model, output model)
+BULK_TABLES = {
+    "products": (Product, ProductCreate, ProductRead),
+    "orders": (Order, OrderCreate, OrderRead),
+    "order-details": (OrderDetail, OrderDetailCreate, OrderDetailRead),
+}
+# Donations are export only: importing them would bypass the campaign totals
+EXPORT_TABLES = {
+    **BULK_TABLES,
+    "donations": (Donation, DonationCreate, DonationRead),
+}
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+# Uploads are spooled to disk past this size, so memory stays bounded
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _get_bulk_table(table: str, tables: dict = BULK_TABLES):
+    if table not in tables:
+        raise HTTPException(status_code=404, detail=f"Unknown bulk table '{table}'")
+    return tables[table]
+
+
+def _resolve_format(fmt: str | None, content_type: str = "") -> str:
+    if fmt is None:
+        fmt = "csv" if "csv" in content_type else "ndjson"
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}', expected one of {', '.join(FORMATS)}")
+    return fmt
+
+
+# --- Import ---
+
+def _read_rows(upload, fmt: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Yields (row number, raw row, parse error) for every record in the upload."""
+    text = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+    if fmt == "csv":
+        # Empty CSV cells mean "not set", so optional columns fall back to their defaults
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, {key: value for key, value in row.items() if value != ""}, None
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield number, None, f"Invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Each line must be a JSON object"
+            continue
+        yield number, row, None
+
+
+def _insert_batch(session: Session, model, batch: list[tuple[int, dict]], errors: list[dict]) -> int:
+    """
+    Inserts a batch with a single executemany. If the batch is rejected by the
+    database, its rows are retried one by one so the failing rows can be reported.
+    """
+    try:
+        rows = [values for _, values in batch]
+        session.exec(insert(model), params=rows)
+        record_inserted_rows(session, model, rows)
+        session.commit()
+        return len(batch)
+    except SQLAlchemyError:
+        session.rollback()
+
+    inserted = 0
+    for number, values in batch:
+        try:
+            session.exec(insert(model), params=[values])
+            record_inserted_rows(session, model, [values])
+            session.commit()
+            inserted += 1
+        except SQLAlchemyError as exc:
+            session.rollback()
+            errors.append({"row": number, "error": str(getattr(exc, "orig", None) or exc)})
+    return inserted
+
+
+def _import_rows(upload, fmt: str, model, create_model) -> dict:
+    errors: list[dict] = []
+    error_count = 0
+    inserted = 0
+    batch: list[tuple[int, dict]] = []
+
+    with Session(engine) as session:
+        for number, raw, parse_error in _read_rows(upload, fmt):
+            if parse_error is None:
+                try:
+                    batch.append((number, create_model.model_validate(raw).model_dump()))
+                except ValidationError as exc:
+                    parse_error = "; ".join(
+                        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors()
+                    )
+            if parse_error is not None:
+                errors.append({"row": number, "error": parse_error})
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                inserted += _insert_batch(session, model, batch, errors)
+                batch = []
+
+            # Only keep the first errors around; the total is always reported
+            if len(errors) > MAX_REPORTED_ERRORS:
+                error_count += len(errors) - MAX_REPORTED_ERRORS
+                del errors[MAX_REPORTED_ERRORS:]
+
+        if batch:
+            inserted += _insert_batch(session, model, batch, errors)
+
+        if inserted and model in CACHED_TABLES:
+            bump_table_version(session, model)
+            session.commit()
+            invalidate_listing_cache(model)
+
+    error_count += len(errors)
+    return {"inserted": inserted, "failed": error_count, "errors": errors[:MAX_REPORTED_ERRORS]}
+
+
+@router.post("/{table}/import")
+async def bulk_import(
+    table: str,
+    request: Request,
+    fmt: str | None = Query(None, alias="format"),
+    admin=Depends(get_current_admin_user),
+):
+    """
+    Imports NDJSON (one object per line) or CSV (with a header row) into a table (Admin only).
+    Rows are inserted in batched transactions; invalid rows are skipped and reported.
+    """
+    model, create_model, _ = _get_bulk_table(table)
+    fmt = _resolve_format(fmt, request.headers.get("content-type", ""))
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        return await run_in_threadpool(_import_rows, upload, fmt, model, create_model)
+
+
+# --- Export ---
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Times without an offset are taken as UTC, the zone rows are stamped in
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class ExportRange:
+    """
+    Optional id and date bounds, so reports can export only the rows added
+    since their last run: pass the last exported id as `after_id`, or a date
+    window with `created_from` (inclusive) and `created_before` (exclusive).
+    """
+
+    def __init__(
+        self,
+        after_id: Optional[int] = Query(None, ge=0, description="Only rows with an id greater than this"),
+        max_id: Optional[int] = Query(None, ge=1, description="Only rows with an id up to and including this"),
+        created_from: Optional[datetime] = Query(None, description="Only rows created at or after this time"),
+        created_before: Optional[datetime] = Query(None, description="Only rows created before this time"),
+    ):
+        self.after_id = after_id
+        self.max_id = max_id
+        self.created_from = _as_utc(created_from)
+        self.created_before = _as_utc(created_before)
+
+    def filters(self, model) -> list:
+        filters = []
+        if self.max_id is not None:
+            filters.append(model.id <= self.max_id)
+        if self.created_from is not None or self.created_before is not None:
+            if "created_at" not in model.__table__.c:
+                raise HTTPException(status_code=400, detail="This table has no creation date to filter on")
+            if self.created_from is not None:
+                filters.append(model.created_at >= self.created_from)
+            if self.created_before is not None:
+                filters.append(model.created_at < self.created_before)
+        return filters
+
+
+def _export_columns(model, read_model) -> list:
+    names = list(read_model.model_fields)
+    if "created_at" in model.__table__.c and "created_at" not in names:
+        names.append("created_at")
+    return [getattr(model, name) for name in names]
+
+
+def _export_rows(model, read_model, fmt: str, export_range: ExportRange) -> Iterator[str | bytes]:
+    """
+    Streams the matching rows in id order, one keyset chunk at a time.
+    Rows are fetched as plain tuples and written out chunk by chunk, so
+    memory stays flat however large the table is.
+    """
+    columns = _export_columns(model, read_model)
+    filters = export_range.filters(model)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(column.key for column in columns)
+        yield buffer.getvalue()
+
+    last_id = export_range.after_id or 0
+    with Session(get_read_engine()) as session:
+        while True:
+            statement = (
+                select(*columns)
+                .where(model.id > last_id, *filters)
+                .order_by(model.id)
+                .limit(EXPORT_CHUNK_SIZE)
+            )
+            rows = session.exec(statement).all()
+            if not rows:
+                return
+            last_id = rows[-1].id
+
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield b"".join(dumps(row._asdict()) + b"\n" for row in rows)
+
+
+@router.get("/{table}/export")
+def bulk_export(
+    table: str,
+    fmt: str = Query("ndjson", alias="format"),
+    export_range: ExportRange = Depends(),
+    admin=Depends(get_current_admin_user_sync),
+):
+    """Streams the rows of a table as NDJSON or CSV, optionally limited to an id or date range (Admin only)."""
+    model, _, read_model = _get_bulk_table(table, EXPORT_TABLES)
+    fmt = _resolve_format(fmt)
+    # Check the filters before the response starts, so bad ones get a 400
+    export_range.filters(model)
+    return StreamingResponse(
+        _export_rows(model, read_model, fmt, export_range),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{fmt}"'},
+    )
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+from database_models import CartItemCreate, CartItemRead, CartItemUpdate, CartSummary, Product
+from routes.auth import get_current_user_sync
+from database import get_session
+from cart_store import CartItems, load_cart, now_iso, save_cart, update_cart
+
+router = APIRouter(prefix="/cart", tags=["Cart"])
+
+def build_cart_summary(session: Session, items: CartItems) -> CartSummary:
+    """Prices the cart with a single IN query against Product."""
+    if not items:
+        return CartSummary(items=[], total=0)
+
+    products = session.exec(select(Product).where(Product.id.in_(list(items)))).all()
+    lines = [
+        CartItemRead(
+            product_id=product.id,
+            product_name=product.name,
+            unit_cost=product.price,
+            quantity=items[product.id]["quantity"],
+            subtotal=product.price * items[product.id]["quantity"],
+            date_added=items[product.id]["date_added"],
+        )
+        for product in products
+    ]
+    return CartSummary(items=lines, total=sum(line.subtotal for line in lines))
+
+@router.get("/", response_model=CartSummary)
+def get_cart(session: Session = Depends(get_session), current_user=Depends(get_current_user_sync)):
+    return build_cart_summary(session, load_cart(session, current_user.id))
+
+@router.post("/items", response_model=CartSummary)
+def add_cart_item(
+    item_in: CartItemCreate,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_sync)
+):
+    product = session.get(Product, item_in.product_id)
+    if not product or product.is_archived:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    def add(items: CartItems):
+        item = items.setdefault(item_in.product_id, {"quantity": 0, "date_added": now_iso()})
+        item["quantity"] += item_in.quantity
+
+    return build_cart_summary(session, update_cart(session, current_user.id, add))
+
+@router.put("/items/{product_id}", response_model=CartSummary)
+def update_cart_item(
+    product_id: int,
+    item_in: CartItemUpdate,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_sync)
+):
+    """Sets the quantity of a cart item; a quantity of 0 removes it."""
+    def set_quantity(items: CartItems):
+        if product_id not in items:
+            raise HTTPException(status_code=404, detail="Item not in cart")
+        if item_in.quantity == 0:
+            del items[product_id]
+        else:
+            items[product_id]["quantity"] = item_in.quantity
+
+    return build_cart_summary(session, update_cart(session, current_user.id, set_quantity))
+
+@router.delete("/items/{product_id}", response_model=CartSummary)
+def remove_cart_item(
+    product_id: int,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_sync)
+):
+    def remove(items: CartItems):
+        if items.pop(product_id, None) is None:
+            raise HTTPException(status_code=404, detail="Item not in cart")
+
+    return build_cart_summary(session, update_cart(session, current_user.id, remove))
+
+@router.delete("/", response_model=CartSummary)
+def clear_cart(current_user=Depends(get_current_user_sync)):
+    save_cart(current_user.id, {})
+    return CartSummary(items=[], total=0)
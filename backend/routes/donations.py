@@ -1,25 +1,30 @@
 # routes/donation.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import case, delete, update
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 # Import the necessary models (including Fundraising to update its collected amount)
 from database_models import Donation, DonationCreate, DonationRead, Fundraising 
-from routes.auth import get_current_user, get_current_admin_user
-from database import get_session
+from routes.auth import get_current_user, get_current_admin_user, get_current_admin_user_sync
+from database import get_async_session, get_read_session, get_async_read_session
+from pagination import PageParams, paginate, read_columns, rows_response
+from http_cache import bump_table_version_after_commit
+from response_cache import invalidate_listing_cache
+from analytics import donation_rollup
+from campaign_events import publish_progress
+from write_batch import run_write
 
 router = APIRouter(prefix="/donation", tags=["Donation"])
 
 @router.post("/", response_model=DonationRead, status_code=status.HTTP_201_CREATED)
 async def create_donation(
     donation_in: DonationCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     # Use get_current_user as any logged-in user can donate
     current_user=Depends(get_current_user) 
 ):
-
-    campaign = session.get(Fundraising, donation_in.campaign_id)
-    if not campaign:
-        raise HTTPException(status_code=404, detail="Fundraising Campaign not found")
-        
     if donation_in.amount <= 0:
         raise HTTPException(status_code=400, detail="Donation amount must be positive")
     
@@ -27,58 +32,105 @@ async def create_donation(
     donation_data["customer_id"] = current_user.id 
     donation = Donation.from_orm(donation_data)
     
-    campaign.collected_amount += donation.amount
-    campaign.supporters += 1
-    
-    session.add(donation)
-    session.add(campaign)
-    session.commit()
-    session.refresh(donation)
-    session.refresh(campaign)
+    def record(session: Session):
+        # Increment the totals in a single UPDATE so concurrent donations to the
+        # same campaign can't overwrite each other's read-modify-write
+        result = session.exec(
+            update(Fundraising)
+            .where(Fundraising.id == donation.campaign_id)
+            .values(
+                collected_amount=Fundraising.collected_amount + donation.amount,
+                supporters=Fundraising.supporters + 1,
+            )
+            .returning(Fundraising.collected_amount, Fundraising.supporters)
+            # A group commit session holds many objects; don't scan them for this row
+            .execution_options(synchronize_session=False)
+        )
+        totals = result.first()
+        if totals is None:
+            raise HTTPException(status_code=404, detail="Fundraising Campaign not found")
+
+        session.add(donation)
+        session.exec(donation_rollup(donation.campaign_id, donation.amount, day=donation.created_at.date()))
+        # Assigns the id before a group commit hands the donation back
+        session.flush()
+        return totals
+
+    totals = await run_write(session, record)
+    # Bumped after the commit, not inside it: the single version row would
+    # otherwise be locked by every donation and serialize them all
+    bump_table_version_after_commit(Fundraising)
+    invalidate_listing_cache(Fundraising)
+    publish_progress(donation.campaign_id, *totals, donation.amount)
     
     return donation
 
 @router.get("/", response_model=list[DonationRead])
-async def list_all_donations(
-    session: Session = Depends(get_session),
-    current_user=Depends(get_current_admin_user) # Admin only
+def list_all_donations(
+    response: Response,
+    page: PageParams = Depends(),
+    campaign_id: Optional[int] = None,
+    min_amount: Optional[float] = Query(None, ge=0),
+    session: Session = Depends(get_read_session),
+    current_user=Depends(get_current_admin_user_sync) # Admin only
 ):
-    """Retrieve a list of all donation records (Admin only)."""
-    donations = session.exec(select(Donation)).all()
-    return donations
+    """Retrieve a page of donation records, optionally filtered by campaign (Admin only)."""
+    filters = []
+    if campaign_id is not None:
+        filters.append(Donation.campaign_id == campaign_id)
+    if min_amount is not None:
+        filters.append(Donation.amount >= min_amount)
+    return paginate(session, Donation, DonationRead, page, response, *filters, fast=True)
 
 @router.get("/user/me", response_model=list[DonationRead])
 async def list_my_donations(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
     current_user=Depends(get_current_user) # Logged-in user only
 ):
     """Retrieve a list of donations made by the current user."""
-    donations = session.exec(select(Donation).where(Donation.customer_id == current_user.id)).all()
-    return donations
+    statement = select(*read_columns(Donation, DonationRead)).where(Donation.customer_id == current_user.id)
+    return rows_response((await session.exec(statement)).all())
     
 @router.delete("/{donation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_donation(
     donation_id: int, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user=Depends(get_current_admin_user) # Admin only
 ):
     """
     Delete a donation record and reverse its effect on the campaign total (Admin only).
     """
-    donation = session.get(Donation, donation_id)
+    donation = await session.get(Donation, donation_id)
     if not donation:
         raise HTTPException(status_code=404, detail="Donation not found")
         
-    # 1. Reverse the collected amount on the campaign
-    campaign = session.get(Fundraising, donation.campaign_id)
-    if campaign:
-        campaign.collected_amount -= donation.amount
-        # Ensure collected amount doesn't drop below zero
-        if campaign.collected_amount < 0:
-             campaign.collected_amount = 0 
-        session.add(campaign)
-        
-    # 2. Delete the donation
-    session.delete(donation)
-    session.commit()
+    # 1. Delete the donation; only the request that actually removed the row
+    #    reverses its effect, so concurrent deletes can't double-count
+    result = await session.exec(delete(Donation).where(Donation.id == donation_id))
+
+    # 2. Reverse the collected amount and supporter count on the campaign atomically
+    totals = None
+    if result.rowcount:
+        collected_amount = Fundraising.collected_amount - donation.amount
+        totals = (await session.exec(
+            update(Fundraising)
+            .where(Fundraising.id == donation.campaign_id)
+            .values(
+                # Ensure neither total drops below zero
+                collected_amount=case((collected_amount < 0, 0), else_=collected_amount),
+                supporters=case((Fundraising.supporters > 0, Fundraising.supporters - 1), else_=0),
+            )
+            .returning(Fundraising.collected_amount, Fundraising.supporters)
+        )).first()
+        if donation.created_at is not None:
+            await session.exec(
+                donation_rollup(donation.campaign_id, -donation.amount, -1, day=donation.created_at.date())
+            )
+
+    await session.commit()
+    invalidate_listing_cache(Fundraising)
+    if totals is not None:
+        # After the commit, as in create_donation, so deletes don't hold the version row
+        bump_table_version_after_commit(Fundraising)
+        publish_progress(donation.campaign_id, *totals, -donation.amount)
     return
\ No newline at end of file
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from database_models import Fundraising, FundraisingCreate, FundraisingRead
-from routes.auth import get_current_admin_user
-from database import get_session
-from database_models import Donation 
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from sqlalchemy import delete
+from database_models import DeleteSummary, Fundraising, FundraisingCreate, FundraisingRead
+from routes.auth import get_current_admin_user_sync
+from database import get_session, get_read_session
+from pagination import PageParams, dumps, paginate
+from http_cache import CatalogCache, bump_table_version
+from response_cache import cached_listing, invalidate_listing_cache
+from cascade import delete_campaign_children
+from campaign_events import CAMPAIGN_EVENTS_HEARTBEAT_SECONDS, CAMPAIGN_EVENTS_MAX_STREAM_SECONDS, hub
 
 router = APIRouter(prefix="/fundraising", tags=["Fundraising"])
 
@@ -11,25 +20,65 @@ router = APIRouter(prefix="/fundraising", tags=["Fundraising"])
 def create_campaign(
     fundraising_in: FundraisingCreate, 
     session: Session = Depends(get_session),
-    current_user=Depends(get_current_admin_user)
+    current_user=Depends(get_current_admin_user_sync)
 ):
     campaign = Fundraising.from_orm(fundraising_in)
     session.add(campaign)
+    bump_table_version(session, Fundraising)
     session.commit()
+    invalidate_listing_cache(Fundraising)
     session.refresh(campaign)
     return campaign
 
-@router.get("/", response_model=list[FundraisingRead])
-def list_campaigns(session: Session = Depends(get_session)):
-    campaigns = session.exec(select(Fundraising)).all()
-    return campaigns
+@router.get("/", response_model=list[FundraisingRead], dependencies=[Depends(CatalogCache(Fundraising))])
+def list_campaigns(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    session: Session = Depends(get_read_session),
+):
+    filters = [Fundraising.status == status_filter] if status_filter is not None else []
+    return cached_listing(
+        request, response, Fundraising, FundraisingRead,
+        lambda: paginate(session, Fundraising, FundraisingRead, page, response, *filters, fast=True),
+    )
+
+@router.get("/events")
+async def campaign_progress_events(campaign_id: Optional[int] = None):
+    """
+    Server-Sent Events stream of `progress` events with a campaign's new
+    `collected_amount` and `supporters` after each donation, for one campaign
+    or all of them. Replaces polling the campaign list.
+    """
+    async def stream():
+        subscription = hub.subscribe(campaign_id)
+        deadline = time.monotonic() + CAMPAIGN_EVENTS_MAX_STREAM_SECONDS
+        try:
+            # Ask browsers to reconnect quickly when the stream ends or drops
+            yield "retry: 3000\n\n"
+            while not subscription.closed and (remaining := deadline - time.monotonic()) > 0:
+                events = await subscription.next_events(min(CAMPAIGN_EVENTS_HEARTBEAT_SECONDS, remaining))
+                if not events:
+                    yield ": keep-alive\n\n"
+                for event in events:
+                    yield f"event: progress\ndata: {dumps(event).decode()}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # Stop proxies from caching or buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.put("/{campaign_id}", response_model=FundraisingRead)
 def update_campaign(
     campaign_id: int, 
     fundraising_in: FundraisingCreate, 
     session: Session = Depends(get_session),
-    current_user=Depends(get_current_admin_user)
+    current_user=Depends(get_current_admin_user_sync)
 ):
     campaign = session.get(Fundraising, campaign_id)
     if not campaign:
@@ -39,25 +88,25 @@ def update_campaign(
         setattr(campaign, key, value)
         
     session.add(campaign)
+    bump_table_version(session, Fundraising)
     session.commit()
+    invalidate_listing_cache(Fundraising)
     session.refresh(campaign)
     return campaign
 
-@router.delete("/{campaign_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{campaign_id}", response_model=DeleteSummary)
 def delete_campaign(
     campaign_id: int, 
     session: Session = Depends(get_session),
-    current_user=Depends(get_current_admin_user)
+    current_user=Depends(get_current_admin_user_sync)
 ):
     campaign = session.get(Fundraising, campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     
-    donations_to_delete = session.exec(select(Donation).where(Donation.campaign_id == campaign_id)).all()
-    for donation in donations_to_delete:
-        session.delete(donation)
-        
-    # Delete the campaign itself
-    session.delete(campaign)
+    deleted = delete_campaign_children(session, campaign_id)
+    deleted["fundraising"] = session.exec(delete(Fundraising).where(Fundraising.id == campaign_id)).rowcount
+    bump_table_version(session, Fundraising)
     session.commit()
-    return
+    invalidate_listing_cache(Fundraising)
+    return DeleteSummary(detail=f"Campaign with ID {campaign_id} deleted", deleted=deleted)
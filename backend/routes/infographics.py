@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from routes.auth import get_current_admin_user
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlmodel import Session
+from routes.auth import get_current_admin_user_sync
 from database_models import Infographic, InfographicCreate, InfographicRead
-from database import get_session
+from database import get_session, get_read_session
+from pagination import PageParams, paginate
+from http_cache import CatalogCache, bump_table_version
 
 router = APIRouter(prefix="/infographics", tags=["Infographics"])
 
@@ -10,27 +12,33 @@ router = APIRouter(prefix="/infographics", tags=["Infographics"])
 def create_infographic(
     infographic: InfographicCreate, 
     session: Session = Depends(get_session), 
-    user=Depends(get_current_admin_user)
+    user=Depends(get_current_admin_user_sync)
 ):
     new_infographic = Infographic.from_orm(infographic)
     session.add(new_infographic)
+    bump_table_version(session, Infographic)
     session.commit()
     session.refresh(new_infographic)
     return new_infographic
 
-@router.get("/", response_model=list[InfographicRead])
-def list_infographics(session: Session = Depends(get_session)):
-    return session.exec(select(Infographic)).all()
+@router.get("/", response_model=list[InfographicRead], dependencies=[Depends(CatalogCache(Infographic))])
+def list_infographics(
+    response: Response,
+    page: PageParams = Depends(),
+    session: Session = Depends(get_read_session),
+):
+    return paginate(session, Infographic, InfographicRead, page, response)
 
 @router.delete("/{infographic_id}")
 def delete_infographic(
     infographic_id: int, 
     session: Session = Depends(get_session), 
-    user=Depends(get_current_admin_user)
+    user=Depends(get_current_admin_user_sync)
 ):
     infographic = session.get(Infographic, infographic_id)
     if not infographic:
         raise HTTPException(status_code=404, detail="Infographic not found")
     session.delete(infographic)
+    bump_table_version(session, Infographic)
     session.commit()
     return {"message": "Infographic deleted"}
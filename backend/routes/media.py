@@ -0,0 +1,111 @@
+import asyncio
+import mimetypes
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import get_async_session
+from database_models import Infographic, MediaRead, Product
+from routes.auth import get_current_admin_user
+from http_cache import table_version_bump
+from response_cache import invalidate_listing_cache
+from media import (
+    MEDIA_MAX_UPLOAD_BYTES, VARIANTS, Image, InvalidImage,
+    is_digest, original_path, original_url, render_all_variants, render_variant,
+    store_original, variant_path, variant_url,
+)
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+# A digest always names the same bytes, so clients may cache these forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def _media_read(digest: str) -> MediaRead:
+    return MediaRead(
+        digest=digest,
+        original=original_url(digest),
+        variants={name: variant_url(digest, name) for name in VARIANTS},
+    )
+
+
+@router.post("/", response_model=MediaRead, status_code=status.HTTP_201_CREATED)
+async def upload_media(
+    file: UploadFile = File(...),
+    product_id: Optional[int] = Query(None, description="Use the image as this product's picture"),
+    infographic_id: Optional[int] = Query(None, description="Use the image for this infographic"),
+    session: AsyncSession = Depends(get_async_session),
+    admin=Depends(get_current_admin_user),
+):
+    """
+    Stores an image and starts rendering its resized WebP variants (Admin only).
+    Products are pointed at the grid-sized `card` variant and infographics at
+    `large`, so pages no longer download the original.
+    """
+    if Image is None:
+        raise HTTPException(status_code=501, detail="Image uploads require Pillow on the server")
+
+    data = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        data.extend(chunk)
+        if len(data) > MEDIA_MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Images are limited to {MEDIA_MAX_UPLOAD_BYTES} bytes")
+
+    try:
+        digest = await run_in_threadpool(store_original, bytes(data))
+    except InvalidImage as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Rendered in the background; a variant requested before it's ready waits for its job
+    render_all_variants(digest)
+
+    attached = []
+    if product_id is not None:
+        attached.append(await _attach(session, Product, product_id, "image", variant_url(digest, "card")))
+    if infographic_id is not None:
+        attached.append(await _attach(session, Infographic, infographic_id, "image_path", variant_url(digest, "large")))
+    if attached:
+        await session.commit()
+        for model in attached:
+            invalidate_listing_cache(model)
+    return _media_read(digest)
+
+async def _attach(session: AsyncSession, model, row_id: int, field: str, url: str):
+    row = await session.get(model, row_id)
+    if not row:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    setattr(row, field, url)
+    session.add(row)
+    await session.exec(table_version_bump(model))
+    return model
+
+
+@router.get("/{digest}")
+def get_original(digest: str):
+    """Serves an uploaded image as it was uploaded."""
+    path = original_path(digest) if is_digest(digest) else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(
+        path,
+        media_type=mimetypes.guess_type(path)[0],
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
+
+@router.get("/{digest}/{variant}.webp")
+async def get_variant(digest: str, variant: str):
+    """Serves a resized WebP variant, waiting for it to be rendered if needed."""
+    if not is_digest(digest) or variant not in VARIANTS or original_path(digest) is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    job = render_variant(digest, variant)
+    if job is not None:
+        await asyncio.wrap_future(job)
+    return FileResponse(
+        variant_path(digest, variant),
+        media_type="image/webp",
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
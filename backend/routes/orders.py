@@ -1,77 +1,187 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlmodel import Session, select
-from database_models import Order, OrderCreate, OrderRead, OrderDetail, OrderDetailCreate
-from routes.auth import get_current_admin_user
-from database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database_models import (
+    Order, OrderCreate, OrderRead, OrderDetail, OrderDetailCreate, OrderDetailRead,
+    CheckoutCreate, CheckoutRead, DeleteSummary, Payment, Product, ShippingInfo,
+)
+from routes.auth import get_current_admin_user_sync, get_current_user_sync
+from database import get_async_session, get_session, get_read_session
+from pagination import PageParams, paginate, read_columns, rows_response
+from cascade import delete_orders
+from cart_store import CartItems, update_cart
+from analytics import order_status_rollup, product_sales_rollup
+from write_batch import run_write
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+# Checkout shipping, matching the rates the storefront shows: a flat rate,
+# waived once the subtotal exceeds the threshold
+SHIPPING_FLAT_RATE = float(os.getenv("SHIPPING_FLAT_RATE", "250"))
+FREE_SHIPPING_THRESHOLD = float(os.getenv("FREE_SHIPPING_THRESHOLD", "5000"))
+
+def shipping_cost_for(subtotal: float) -> float:
+    return 0.0 if subtotal > FREE_SHIPPING_THRESHOLD else SHIPPING_FLAT_RATE
+
 # CRUD for Orders
 @router.post("/", response_model=OrderRead, status_code=status.HTTP_201_CREATED)
-def create_order(order_in: OrderCreate, session: Session = Depends(get_session)):
+async def create_order(order_in: OrderCreate, session: AsyncSession = Depends(get_async_session)):
     order = Order.from_orm(order_in)
+
+    def record(session: Session):
+        session.add(order)
+        session.exec(order_status_rollup({order.status: 1}))
+        session.flush()
+
+    await run_write(session, record)
+    return order
+
+@router.post("/checkout", response_model=CheckoutRead, status_code=status.HTTP_201_CREATED)
+def checkout(
+    checkout_in: CheckoutCreate,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_sync)
+):
+    """
+    Places an order for the whole cart in one request. The shipping info, order,
+    order details and payment are written in a single transaction, so a failure
+    never leaves a partially created order behind.
+    """
+    # Price every line item from the catalog with a single IN query
+    product_ids = {item.product_id for item in checkout_in.items}
+    products = {
+        product.id: product
+        for product in session.exec(
+            select(Product).where(Product.id.in_(product_ids), Product.is_archived == False)
+        ).all()
+    }
+    unavailable = sorted(product_ids - products.keys())
+    if unavailable:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Products not available: {', '.join(str(product_id) for product_id in unavailable)}",
+        )
+
+    subtotal = sum(products[item.product_id].price * item.quantity for item in checkout_in.items)
+    shipping = ShippingInfo(
+        shipping_type=checkout_in.shipping.shipping_type,
+        shipping_address=checkout_in.shipping.shipping_address,
+        shipping_cost=shipping_cost_for(subtotal),
+    )
+    session.add(shipping)
+    session.flush()
+
+    order = Order(customer_id=current_user.id, customer_name=current_user.name, shipping_id=shipping.id)
     session.add(order)
+    session.flush()
+
+    details = [
+        OrderDetail(
+            order_id=order.id,
+            product_id=item.product_id,
+            product_name=products[item.product_id].name,
+            unit_cost=products[item.product_id].price,
+            quantity=item.quantity,
+        )
+        for item in checkout_in.items
+    ]
+    payment = Payment(order_id=order.id, amount=subtotal + shipping.shipping_cost, payment_method=checkout_in.payment_method)
+    session.add_all(details)
+    session.add(payment)
+    session.exec(order_status_rollup({order.status: 1}))
+    session.exec(product_sales_rollup([detail.model_dump() for detail in details]))
+    session.flush()
+
+    # Build the response before committing so nothing needs to be reloaded afterwards
+    result = CheckoutRead.model_validate(
+        {"order": order, "details": details, "shipping": shipping, "payment": payment},
+        from_attributes=True,
+    )
     session.commit()
-    session.refresh(order)
-    return order
+
+    def remove_ordered(items: CartItems):
+        for product_id in product_ids:
+            items.pop(product_id, None)
+
+    update_cart(session, current_user.id, remove_ordered)
+    return result
 
 @router.get("/", response_model=list[OrderRead])
 def list_orders(
-    session: Session = Depends(get_session), 
-    current_user=Depends(get_current_admin_user)
+    response: Response,
+    page: PageParams = Depends(),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    customer_id: Optional[int] = None,
+    session: Session = Depends(get_read_session), 
+    current_user=Depends(get_current_admin_user_sync)
 ):
-    orders = session.exec(select(Order)).all()
-    return orders
+    filters = []
+    if status_filter is not None:
+        filters.append(Order.status == status_filter)
+    if customer_id is not None:
+        filters.append(Order.customer_id == customer_id)
+    return paginate(session, Order, OrderRead, page, response, *filters, fast=True)
 
 @router.put("/{order_id}", response_model=OrderRead)
 def update_order(
     order_id: int, 
     order_in: OrderCreate, 
     session: Session = Depends(get_session), 
-    current_user=Depends(get_current_admin_user)
+    current_user=Depends(get_current_admin_user_sync)
 ):
     order = session.get(Order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    previous_status = order.status
     for key, value in order_in.dict().items():
         setattr(order, key, value)
         
     session.add(order)
+    if order.status != previous_status:
+        session.exec(order_status_rollup({previous_status: -1, order.status: 1}))
     session.commit()
     session.refresh(order)
     return order
 
-@router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{order_id}", response_model=DeleteSummary)
 def delete_order(
     order_id: int, 
     session: Session = Depends(get_session), 
-    current_user=Depends(get_current_admin_user)
+    current_user=Depends(get_current_admin_user_sync)
 ):
     order = session.get(Order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-        
-    session.delete(order)
+
+    # Details, payment and shipping info go with the order
+    deleted = delete_orders(session, Order.id == order_id)
     session.commit()
-    return
+    return DeleteSummary(detail=f"Order with ID {order_id} deleted", deleted=deleted)
 
 # CRUD for Order Details
 @router.post("/{order_id}/details", response_model=OrderDetail)
-def add_order_detail(
+async def add_order_detail(
     order_id: int, 
     detail_in: OrderDetailCreate, 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     detail = OrderDetail.from_orm(detail_in)
     # Ensure the detail is associated with the correct order
     detail.order_id = order_id 
-    session.add(detail)
-    session.commit()
-    session.refresh(detail)
+
+    def record(session: Session):
+        session.add(detail)
+        session.exec(product_sales_rollup([detail.model_dump()]))
+        session.flush()
+
+    await run_write(session, record)
     return detail
 
 @router.get("/{order_id}/details", response_model=list[OrderDetail])
-def list_order_details(order_id: int, session: Session = Depends(get_session)):
-    details = session.exec(select(OrderDetail).where(OrderDetail.order_id == order_id)).all()
-    return details
+def list_order_details(order_id: int, session: Session = Depends(get_read_session)):
+    statement = select(*read_columns(OrderDetail, OrderDetailRead)).where(OrderDetail.order_id == order_id)
+    return rows_response(session.exec(statement).all())
@@ -1,27 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from database_models import Product, ProductCreate, ProductRead
-from routes.auth import get_current_admin_user
-from database import get_session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import Session
+from database_models import Product, ProductCreate, ProductRead, ProductSearchResult
+from routes.auth import get_current_admin_user_sync
+from database import get_session, get_read_session
+from pagination import NEXT_OFFSET_HEADER, PageParams, SearchParams, paginate
+from http_cache import CatalogCache, bump_table_version
+from response_cache import cached_listing, invalidate_listing_cache
+from search import search
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
-@router.get("/", response_model=list[ProductRead])
-def list_available_products(session: Session = Depends(get_session)):
+def _price_filters(min_price: Optional[float], max_price: Optional[float]):
+    filters = []
+    if min_price is not None:
+        filters.append(Product.price >= min_price)
+    if max_price is not None:
+        filters.append(Product.price <= max_price)
+    return filters
+
+@router.get("/", response_model=list[ProductRead], dependencies=[Depends(CatalogCache(Product))])
+def list_available_products(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    session: Session = Depends(get_read_session),
+):
     # This filters out any product where is_archived is True
-    statement = select(Product).where(Product.is_archived == False) 
-    return session.exec(statement).all()
+    filters = [Product.is_archived == False, *_price_filters(min_price, max_price)]
+    return cached_listing(
+        request, response, Product, ProductRead,
+        lambda: paginate(session, Product, ProductRead, page, response, *filters, fast=True),
+    )
 
 @router.get("/all", response_model=list[ProductRead])
 def list_all_products(
-    session: Session = Depends(get_session), 
-    admin=Depends(get_current_admin_user) 
+    response: Response,
+    page: PageParams = Depends(),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    is_archived: Optional[bool] = None,
+    session: Session = Depends(get_read_session), 
+    admin=Depends(get_current_admin_user_sync) 
+):
+    # This returns everything in the table, optionally narrowed by the filters
+    filters = _price_filters(min_price, max_price)
+    if is_archived is not None:
+        filters.append(Product.is_archived == is_archived)
+    return paginate(session, Product, ProductRead, page, response, *filters, fast=True)
+
+@router.get("/search", response_model=list[ProductSearchResult])
+def search_products(
+    response: Response,
+    params: SearchParams = Depends(),
+    session: Session = Depends(get_read_session),
 ):
-    # This returns everything in the table
-    return session.exec(select(Product)).all()
+    """Full-text search over product names and descriptions, best matches first."""
+    rows = search(session, "product", params.q, params.limit + 1, params.offset)
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        response.headers[NEXT_OFFSET_HEADER] = str(params.offset + params.limit)
+    return rows
 
-@router.get("/{product_id}", response_model=ProductRead)
-def get_product(product_id: int, session: Session = Depends(get_session)):
+@router.get("/{product_id}", response_model=ProductRead, dependencies=[Depends(CatalogCache(Product))])
+def get_product(product_id: int, session: Session = Depends(get_read_session)):
     db_item = session.get(Product, product_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -31,11 +76,13 @@ def get_product(product_id: int, session: Session = Depends(get_session)):
 def create_product(
     product: ProductCreate,
     session: Session = Depends(get_session),
-    admin=Depends(get_current_admin_user)
+    admin=Depends(get_current_admin_user_sync)
 ):
     db_item = Product.from_orm(product)
     session.add(db_item)
+    bump_table_version(session, Product)
     session.commit()
+    invalidate_listing_cache(Product)
     session.refresh(db_item)
     return db_item
 
@@ -44,7 +91,7 @@ def update_product(
     product_id: int,
     product: ProductCreate,
     session: Session = Depends(get_session),
-    admin=Depends(get_current_admin_user)
+    admin=Depends(get_current_admin_user_sync)
 ):
     db_item = session.get(Product, product_id)
     if not db_item:
@@ -54,6 +101,8 @@ def update_product(
         setattr(db_item, key, value)
 
     session.add(db_item)
+    bump_table_version(session, Product)
     session.commit()
+    invalidate_listing_cache(Product)
     session.refresh(db_item)
     return db_item
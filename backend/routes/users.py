@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session, select
 from typing import List, Optional
 
 # Import necessary models and dependencies
-from database_models import User, UserCreate, UserRead, UserLogin, UserBase
-from routes.auth import get_current_admin_user, get_password_hash, get_current_user
-from database import get_session
+from sqlalchemy import delete
+from database_models import DeleteSummary, Fundraising, User, UserCreate, UserRead, UserLogin, UserBase
+from routes.auth import get_current_admin_user_sync, get_password_hash, invalidate_cached_user
+from database import get_session, get_read_session
+from pagination import PageParams, paginate
+from cascade import delete_user_children
+from response_cache import invalidate_listing_cache
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -25,12 +29,16 @@ def update_user_password(db_user: User, user_in: UserBase):
 # 1. READ (List All Users)
 @router.get("/", response_model=List[UserRead])
 def list_users(
-    session: Session = Depends(get_session),
-    admin=Depends(get_current_admin_user) # Protect this endpoint for admins only
+    response: Response,
+    page: PageParams = Depends(),
+    is_admin: Optional[bool] = None,
+    session: Session = Depends(get_read_session),
+    admin=Depends(get_current_admin_user_sync) # Protect this endpoint for admins only
 ):
-    """Lists all users (Admin only)."""
+    """Lists all users, one page at a time (Admin only)."""
     # Exclude the initial admin user from the list if desired, or just return all
-    return session.exec(select(User)).all()
+    filters = [User.is_admin == is_admin] if is_admin is not None else []
+    return paginate(session, User, UserRead, page, response, *filters, fast=True)
 
 
 # 2. CREATE (Add New User)
@@ -38,7 +46,7 @@ def list_users(
 def create_user(
     user_in: UserCreate,
     session: Session = Depends(get_session),
-    admin=Depends(get_current_admin_user)
+    admin=Depends(get_current_admin_user_sync)
 ):
     """Creates a new user (Admin only)."""
     existing_user = session.exec(select(User).where(User.email == user_in.email)).first()
@@ -60,7 +68,7 @@ def update_user(
     user_id: int,
     user_in: UserCreate, # Reusing UserCreate for update input
     session: Session = Depends(get_session),
-    admin=Depends(get_current_admin_user)
+    admin=Depends(get_current_admin_user_sync)
 ):
     """Updates an existing user (Admin only)."""
     db_user = session.get(User, user_id)
@@ -80,15 +88,16 @@ def update_user(
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    invalidate_cached_user(user_id)
     return db_user
 
 
 # 4. DELETE (Delete User)
-@router.delete("/{user_id}", status_code=status.HTTP_200_OK)
+@router.delete("/{user_id}", status_code=status.HTTP_200_OK, response_model=DeleteSummary)
 def delete_user(
     user_id: int,
     session: Session = Depends(get_session),
-    admin=Depends(get_current_admin_user)
+    admin=Depends(get_current_admin_user_sync)
 ):
     """Deletes a user (Admin only)."""
     db_user = session.get(User, user_id)
@@ -99,6 +108,11 @@ def delete_user(
     if admin.id == user_id:
         raise HTTPException(status_code=400, detail="Cannot delete your own admin account")
 
-    session.delete(db_user)
+    # Orders, donations and the saved cart are removed in the same transaction
+    deleted = delete_user_children(session, user_id)
+    deleted["user"] = session.exec(delete(User).where(User.id == user_id)).rowcount
     session.commit()
-    return {"detail": f"User with ID {user_id} deleted"}
\ No newline at end of file
+    invalidate_cached_user(user_id)
+    if deleted["donation"]:
+        invalidate_listing_cache(Fundraising)
+    return DeleteSummary(detail=f"User with ID {user_id} deleted", deleted=deleted)
\ No newline at end of file
@@ -1,36 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from routes.auth import get_current_admin_user
-from database_models import Video, VideoCreate, VideoRead
-from database import get_session
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import formatdate
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlmodel import Session
+from routes.auth import get_current_admin_user_sync
+from database_models import Video, VideoCreate, VideoRead, VideoSearchResult
+from database import get_session, get_read_session
+from pagination import NEXT_OFFSET_HEADER, PageParams, SearchParams, paginate
+from http_cache import CatalogCache, bump_table_version, etag_matches, not_modified_since
+from search import search
 
 router = APIRouter(prefix="/videos", tags=["Videos"])
 
+# Relative Video.filepath values are resolved inside this directory
+VIDEO_ROOT = os.getenv("VIDEO_ROOT", "videos")
+# Bytes read per chunk while streaming; only the requested range is ever read
+VIDEO_CHUNK_BYTES = 256 * 1024
+VIDEO_CACHE_MAX_AGE = int(os.getenv("VIDEO_CACHE_MAX_AGE", "86400"))
+
 @router.post("/", response_model=VideoRead)
 def create_video(
     video: VideoCreate, 
     session: Session = Depends(get_session), 
-    user=Depends(get_current_admin_user)
+    user=Depends(get_current_admin_user_sync)
 ):
     new_video = Video.from_orm(video)
     session.add(new_video)
+    bump_table_version(session, Video)
     session.commit()
     session.refresh(new_video)
     return new_video
 
-@router.get("/", response_model=list[VideoRead])
-def list_videos(session: Session = Depends(get_session)):
-    return session.exec(select(Video)).all()
+@router.get("/", response_model=list[VideoRead], dependencies=[Depends(CatalogCache(Video))])
+def list_videos(
+    response: Response,
+    page: PageParams = Depends(),
+    session: Session = Depends(get_read_session),
+):
+    return paginate(session, Video, VideoRead, page, response)
+
+@router.get("/search", response_model=list[VideoSearchResult])
+def search_videos(
+    response: Response,
+    params: SearchParams = Depends(),
+    session: Session = Depends(get_read_session),
+):
+    """Full-text search over story video titles and descriptions, best matches first."""
+    rows = search(session, "video", params.q, params.limit + 1, params.offset)
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        response.headers[NEXT_OFFSET_HEADER] = str(params.offset + params.limit)
+    return rows
 
 @router.delete("/{video_id}")
 def delete_video(
     video_id: int, 
     session: Session = Depends(get_session), 
-    user=Depends(get_current_admin_user)
+    user=Depends(get_current_admin_user_sync)
 ):
     video = session.get(Video, video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     session.delete(video)
+    bump_table_version(session, Video)
     session.commit()
     return {"message": "Video deleted"}
+
+def _resolve_video_path(filepath: str) -> str:
+    root = os.path.realpath(VIDEO_ROOT)
+    path = os.path.realpath(os.path.join(root, filepath))
+    # Refuse paths that escape the video directory, e.g. "../database.db"
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Video file not found")
+    return path
+
+@router.get("/{video_id}/stream")
+def stream_video(video_id: int, request: Request, session: Session = Depends(get_read_session)):
+    """
+    Streams a story video with HTTP Range support, so players can seek and
+    only the requested bytes are read. Remote filepaths are redirected to.
+    """
+    video = session.get(Video, video_id)
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if video.filepath.startswith(("http://", "https://")):
+        return RedirectResponse(video.filepath)
+
+    path = _resolve_video_path(video.filepath)
+    stat = os.stat(path)
+    etag = '"' + hashlib.sha1(f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest()[:20] + '"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": f"public, max-age={VIDEO_CACHE_MAX_AGE}",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+        not_modified = bool(if_modified_since and not_modified_since(if_modified_since, modified))
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse answers Range and If-Range requests with 206 (or 416) and
+    # reads just that part of the file in chunks
+    response = FileResponse(path, stat_result=stat, headers=headers)
+    response.chunk_size = VIDEO_CHUNK_BYTES
+    return response
@@ -0,0 +1,131 @@
+import html
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Connection, text
+from sqlmodel import Session
+
+# Full-text search over products and stories backed by SQLite FTS5.
+# Each index is an external-content FTS5 table over its source table, kept in
+# sync by triggers, so every write path (routes, bulk imports, migrations)
+# updates it in the same transaction without any application code.
+
+@dataclass(frozen=True)
+class SearchIndex:
+    table: str
+    columns: tuple[str, ...]
+    # bm25 weight per column, e.g. a match in the name ranks above one in the description
+    weights: tuple[float, ...]
+    # Extra condition on the source table, e.g. hiding archived products
+    visible: str = "1 = 1"
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+
+SEARCH_INDEXES = {
+    "product": SearchIndex("product", ("name", "description"), (10.0, 1.0), visible="src.is_archived = 0"),
+    "video": SearchIndex("video", ("title", "description"), (10.0, 1.0)),
+}
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_TOKENS = 16
+# FTS5 wraps matches in these private-use characters, which are swapped for
+# the <mark> tags only after the column text has been HTML-escaped
+_MATCH_OPEN = "\ue000"
+_MATCH_CLOSE = "\ue001"
+
+
+# --- Index Setup ---
+
+def _create_statements(index: SearchIndex) -> list[str]:
+    fts, table = index.fts_table, index.table
+    columns = ", ".join(index.columns)
+    new_values = ", ".join(f"new.{column}" for column in index.columns)
+    old_values = ", ".join(f"old.{column}" for column in index.columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+    ]
+
+def ensure_search_indexes(connection: Connection):
+    """Creates missing FTS5 tables and triggers, indexing existing rows once."""
+    if connection.dialect.name != "sqlite":
+        return
+    for index in SEARCH_INDEXES.values():
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": index.fts_table},
+        ).first()
+        for statement in _create_statements(index):
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text(f"INSERT INTO {index.fts_table}({index.fts_table}) VALUES ('rebuild')"))
+
+
+# --- Queries ---
+
+def to_match_query(query: str) -> str:
+    """
+    Turns free text into a safe FTS5 query: every word must match, and the
+    last one also matches as a prefix so results show up while typing.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def search(session: Session, index_name: str, query: str, limit: int, offset: int):
+    """
+    Returns a page of rows ranked by bm25 as dicts with every source column,
+    a `snippet` of the best matching column and a highlighted first column.
+    The snippet and highlight are HTML-escaped with matches wrapped in <mark>.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Full-text search requires SQLite FTS5")
+
+    index = SEARCH_INDEXES[index_name]
+    fts = index.fts_table
+    weights = ", ".join(str(weight) for weight in index.weights)
+    statement = text(
+        f"SELECT src.*, "
+        f"snippet({fts}, -1, :open, :close, '…', {SNIPPET_TOKENS}) AS snippet, "
+        f"highlight({fts}, 0, :open, :close) AS {index.columns[0]}_highlight "
+        f"FROM {fts} JOIN {index.table} AS src ON src.id = {fts}.rowid "
+        f"WHERE {fts} MATCH :query AND {index.visible} "
+        f"ORDER BY bm25({fts}, {weights}) "
+        f"LIMIT :limit OFFSET :offset"
+    )
+    rows = session.exec(
+        statement,
+        params={
+            "query": to_match_query(query),
+            "open": _MATCH_OPEN,
+            "close": _MATCH_CLOSE,
+            "limit": limit,
+            "offset": offset,
+        },
+    ).mappings().all()
+    highlighted = ("snippet", f"{index.columns[0]}_highlight")
+    return [
+        {**row, **{column: to_marked_html(row[column]) for column in highlighted}}
+        for row in rows
+    ]
+
+def to_marked_html(value: Optional[str]) -> str:
+    """HTML-escapes FTS5 output, then turns its match markers into <mark> tags."""
+    escaped = html.escape(value or "")
+    return escaped.replace(_MATCH_OPEN, HIGHLIGHT_OPEN).replace(_MATCH_CLOSE, HIGHLIGHT_CLOSE)
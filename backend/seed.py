@@ -0,0 +1,125 @@
+# seed.py
+# One-shot seeding of a new database with the admin account and demo catalog.
+# Run `python seed.py` after `python -m migrations`; the API also runs it
+# automatically when its startup migration created a brand new database.
+
+from sqlmodel import Session, select
+
+from database import engine
+from database_models import User, Fundraising, Product
+from routes.auth import get_password_hash
+
+# --- INITIAL DATA DEFINITIONS ---
+
+INITIAL_CAMPAIGN_DATA = [
+    {
+        "title": "Emergency Support for Weaver Families",
+        "description": "Help provide immediate assistance to weaver families affected by recent natural disasters in the region.",
+        "collected_amount": 125000, 
+        "goal_amount": 200000,
+        "supporters": 89,
+        "days_left": 15,
+        "image": "https://www.lakwatsero.com/wp-content/uploads/2021/11/Cordillera-Weaves-06.jpg",
+        "is_urgent": True
+    },
+    {
+        "title": "Traditional Loom Restoration Project",
+        "description": "Restore and maintain traditional looms to ensure the continuation of authentic weaving techniques.",
+        "collected_amount": 85000,
+        "goal_amount": 150000,
+        "supporters": 67,
+        "days_left": 28,
+        "image": "https://www.textileschool.com/wp-content/uploads/2025/03/traditional-weavers-working-on-handlooms-in-a-rural-setting.jpg",
+        "is_urgent": False
+    },
+    {
+        "title": "Youth Weaving Education Program",
+        "description": "Fund educational programs to teach traditional weaving skills to the next generation of artisans.",
+        "collected_amount": 45000,
+        "goal_amount": 100000,
+        "supporters": 34,
+        "days_left": 42,
+        "image": "https://www.sapiens.org/app/uploads/2020/08/06_Paulette.Crespillo-Cuison_compressed.jpg",
+        "is_urgent": False
+    }
+]
+
+INITIAL_PRODUCT_DATA = [
+    {
+        "name": "Cordillera Wall Hanging",
+        "price": 595.00,
+        "description": "Handwoven Wall Decor handmade by our Baguio Locals.",
+        "image": "https://files.catbox.moe/yaap40.jpg",
+        "is_archived": False
+    },
+    {
+        "name": "Inabel Super Brocade Twin Blanket",
+        "price": 8107,
+        "description": "Inabel, sometimes referred to as Abel Iloco or simply Abel, is a weaving tradition native to the Ilocano people of Northern Luzon in the Philippines. The textile it produces is sought after in the fashion and interior design industries due to its softness, durability, suitability in tropical climates, and for its austere design patterns.",
+        "image": "https://files.catbox.moe/wnw7it.webp",
+        "is_archived": False
+    },
+    {
+        "name": "Ikat Weave on Bamboo Table Runner - Red",
+        "price": 2313,
+        "description": "These ikat weave bamboo table runners were handcrafted by independent Balinese artisans. Ikat dyeing is a traditional technique that has been passed down through generations. Add these trendy runners to your table for a pop of colour. (Specifications: Handcrafted in Bali, Cotton weave on bamboo, 180 CM L)",
+        "image": "https://files.catbox.moe/hvwfrc.webp",
+        "is_archived": False
+    },
+    {
+        "name": "VMWI1 - Kalinga Infinity Scarf",
+        "price": 3600,
+        "description": "From Makabayan Wear, this is a more modern scarf design using traditional fabric hand woven by the renowned indigenous weavers of kalinga, Philipipnes",
+        "image": "https://files.catbox.moe/wnfxbd.png"
+    }
+]
+
+# --- INITIALIZATION FUNCTIONS ---
+
+def create_initial_admin(session: Session):
+    """Checks for users and creates an initial admin if none exist."""
+    existing_users = session.exec(select(User)).first()
+    if not existing_users:
+        admin_user = User(
+            name="Admin User",
+            email="admin@weaving.com",
+            is_admin=True,
+            hashed_password=get_password_hash("adminpass"),
+            address="Cordillera HQ",
+        )
+        session.add(admin_user)
+        session.commit()
+        print("Initial Admin created.")
+
+def create_initial_campaigns(session: Session):
+    """Inserts initial campaign data if the campaigns table is empty."""
+    existing_campaigns = session.exec(select(Fundraising)).first() 
+    if not existing_campaigns:
+        print("Inserting initial campaign data...")
+        for data in INITIAL_CAMPAIGN_DATA:
+            # Explicitly cast collected_amount/goal_amount to float if not already done
+            campaign = Fundraising(**data) 
+            session.add(campaign)
+        session.commit()
+        print(f"Successfully inserted {len(INITIAL_CAMPAIGN_DATA)} campaigns.")
+
+def create_initial_products(session: Session):
+    """Inserts initial product data if the products table is empty."""
+    existing_products = session.exec(select(Product)).first()
+    if not existing_products:
+        print("Inserting initial product data...")
+        for data in INITIAL_PRODUCT_DATA:
+            product = Product(**data)
+            session.add(product)
+        session.commit()
+        print(f"Successfully inserted {len(INITIAL_PRODUCT_DATA)} products.")
+
+def seed_database(session: Session):
+    """Inserts the initial admin, campaigns and products into empty tables."""
+    create_initial_admin(session)
+    create_initial_campaigns(session)
+    create_initial_products(session)
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        seed_database(session)
@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+
+# The API modules read their settings at import time, so point them at a
+# throwaway database before anything imports them.
+_data_dir = tempfile.mkdtemp(prefix="weaving-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_data_dir, 'database.db')}")
+os.environ.setdefault("MEDIA_ROOT", os.path.join(_data_dir, "media"))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    # Entering the client runs the lifespan, which migrates and seeds the database once
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def admin_headers(client):
+    response = client.post("/login", json={"email": "admin@weaving.com", "password": "adminpass"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def campaign(client, admin_headers) -> int:
+    response = client.post("/fundraising/", json={"title": "Loom repairs", "goal_amount": 10_000}, headers=admin_headers)
+    assert response.status_code == 201
+    return response.json()["id"]
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import routes.auth
+
+
+def login(client: TestClient, email: str, password: str) -> dict:
+    response = client.post("/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def register(client: TestClient, email: str) -> int:
+    response = client.post("/register", json={"email": email, "name": "Test", "password": "secret"})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("trust_token_claims", [False, True])
+def test_token_of_deleted_user_is_rejected_after_id_reuse(monkeypatch, client, admin_headers, trust_token_claims):
+    monkeypatch.setattr(routes.auth, "AUTH_TRUST_TOKEN_CLAIMS", trust_token_claims)
+    old_email, new_email = f"old-{trust_token_claims}@example.com", f"new-{trust_token_claims}@example.com"
+
+    old_id = register(client, old_email)
+    old_token = login(client, old_email, "secret")
+    assert client.get("/cart/", headers=old_token).status_code == 200
+
+    assert client.delete(f"/users/{old_id}", headers=admin_headers).status_code == 200
+    # SQLite hands the highest rowid out again once it's deleted
+    assert register(client, new_email) == old_id
+
+    # Sync and async routes authenticate through separate dependencies
+    assert client.get("/cart/", headers=old_token).status_code == 401
+    assert client.get("/donation/user/me", headers=old_token).status_code == 401
+    assert client.get("/cart/", headers=login(client, new_email, "secret")).status_code == 200
+
+
+def test_sync_hashing_does_not_use_the_request_pool():
+    slots = routes.auth.PASSWORD_HASH_WORKERS + routes.auth.PASSWORD_HASH_MAX_PENDING
+    for _ in range(slots):
+        routes.auth._hash_slots.acquire()
+    try:
+        hashed = routes.auth.get_password_hash("secret")
+        assert routes.auth.verify_password("secret", hashed)
+        with pytest.raises(HTTPException) as rejected:
+            asyncio.run(routes.auth.get_password_hash_async("secret"))
+        assert rejected.value.status_code == 503
+    finally:
+        for _ in range(slots):
+            routes.auth._hash_slots.release()
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from cart_store import InMemoryCartStore
+
+
+def add_one(items):
+    item = items.setdefault(1, {"quantity": 0, "date_added": "2024-01-01T00:00:00"})
+    item["quantity"] += 1
+
+
+def test_concurrent_updates_are_not_lost():
+    store = InMemoryCartStore()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(200):
+            pool.submit(store.update, 7, dict, add_one)
+    assert store.update(7, dict)[1]["quantity"] == 200
+
+
+def test_flushed_carts_are_evicted_but_dirty_ones_are_kept():
+    store = InMemoryCartStore(maxsize=2)
+    for user_id in range(5):
+        store.update(user_id, dict, add_one)
+    # Nothing is flushed yet, so every cart is still held
+    assert len(store.pop_dirty()) == 5
+    loads = []
+    store.update(0, lambda: loads.append(0) or {})
+    assert loads == [0]
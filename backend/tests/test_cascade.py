@@ -0,0 +1,46 @@
+from sqlmodel import Session, func, select
+
+from cart_store import cart_store, flush_dirty_carts
+from database import engine
+from database_models import Cart, Donation, Fundraising, Order, OrderDetail, Payment, ShippingInfo
+
+
+def count(session: Session, model, *criteria) -> int:
+    return session.exec(select(func.count()).select_from(model).where(*criteria)).one()
+
+
+def test_deleting_a_user_removes_their_rows_and_reduces_campaign_totals(client, admin_headers, campaign):
+    user_id = client.post(
+        "/register", json={"email": "leaving@example.com", "name": "Leaving", "password": "secret"}
+    ).json()["id"]
+    token = client.post("/login", json={"email": "leaving@example.com", "password": "secret"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Someone else's donation stays on the campaign
+    client.post("/donation/", json={"campaign_id": campaign, "amount": 500}, headers=admin_headers)
+    for amount in (100, 50):
+        client.post("/donation/", json={"campaign_id": campaign, "amount": amount}, headers=headers)
+    order = client.post("/orders/checkout", headers=headers, json={
+        "items": [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 2}],
+        "shipping": {"shipping_type": "Standard", "shipping_address": "Baguio City"},
+        "payment_method": "Cash on Delivery",
+    }).json()
+    client.post("/cart/items", json={"product_id": 3, "quantity": 1}, headers=headers)
+    flush_dirty_carts()
+
+    response = client.delete(f"/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["deleted"] == {
+        "orderdetail": 2, "payment": 1, "order": 1, "shippinginfo": 1, "donation": 2, "cart": 1, "user": 1,
+    }
+
+    with Session(engine) as session:
+        assert count(session, Order, Order.customer_id == user_id) == 0
+        assert count(session, OrderDetail, OrderDetail.order_id == order["order"]["id"]) == 0
+        assert count(session, Payment, Payment.order_id == order["order"]["id"]) == 0
+        assert count(session, ShippingInfo, ShippingInfo.id == order["shipping"]["id"]) == 0
+        assert count(session, Donation, Donation.customer_id == user_id) == 0
+        assert count(session, Cart, Cart.customer_id == user_id) == 0
+        totals = session.get(Fundraising, campaign)
+        assert (totals.collected_amount, totals.supporters) == (500, 1)
+    assert cart_store.update(user_id, dict) == {}
@@ -0,0 +1,18 @@
+def test_checkout_prices_shipping_and_clears_ordered_items(client, admin_headers):
+    client.delete("/cart/", headers=admin_headers)
+    for product_id in (1, 2):
+        client.post("/cart/items", json={"product_id": product_id, "quantity": 1}, headers=admin_headers)
+    price = client.get("/products/1").json()["price"]
+
+    response = client.post("/orders/checkout", headers=admin_headers, json={
+        "items": [{"product_id": 1, "quantity": 1}],
+        # A client-sent cost is ignored
+        "shipping": {"shipping_type": "Standard", "shipping_cost": -1000, "shipping_address": "Baguio City"},
+        "payment_method": "Cash on Delivery",
+    })
+    assert response.status_code == 201
+    assert response.json()["shipping"]["shipping_cost"] == 250
+    assert response.json()["payment"]["amount"] == price + 250
+
+    cart = client.get("/cart/", headers=admin_headers).json()
+    assert [item["product_id"] for item in cart["items"]] == [2]
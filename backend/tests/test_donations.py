@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel import Session
+
+from database import engine
+from database_models import Fundraising
+
+
+def campaign_totals(campaign_id: int) -> tuple[float, int]:
+    with Session(engine) as session:
+        campaign = session.get(Fundraising, campaign_id)
+        return campaign.collected_amount, campaign.supporters
+
+def donate(client, headers, campaign_id: int, amount: float) -> int:
+    response = client.post("/donation/", json={"campaign_id": campaign_id, "amount": amount}, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_concurrent_donations_land_exact_totals(client, admin_headers, campaign):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: donate(client, admin_headers, campaign, 25), range(40)))
+    assert campaign_totals(campaign) == (1000, 40)
+
+def test_deleting_a_donation_reverts_the_totals(client, admin_headers, campaign):
+    donate(client, admin_headers, campaign, 100)
+    removed = donate(client, admin_headers, campaign, 40)
+
+    assert client.delete(f"/donation/{removed}", headers=admin_headers).status_code == 204
+    assert campaign_totals(campaign) == (100, 1)
+    # A repeated delete finds nothing and changes nothing
+    assert client.delete(f"/donation/{removed}", headers=admin_headers).status_code == 404
+    assert campaign_totals(campaign) == (100, 1)
+
+def test_deleting_from_a_zeroed_campaign_does_not_go_negative(client, admin_headers, campaign):
+    donation_id = donate(client, admin_headers, campaign, 100)
+    # An admin resets the campaign's totals by hand
+    response = client.put(
+        f"/fundraising/{campaign}",
+        json={"title": "Loom repairs", "goal_amount": 10_000, "collected_amount": 0, "supporters": 0},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+
+    assert client.delete(f"/donation/{donation_id}", headers=admin_headers).status_code == 204
+    assert campaign_totals(campaign) == (0, 0)
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import Engine, text
+from sqlmodel import select
+
+from database import make_engine
+from database_models import Cart, Donation, Order, OrderDetail, Payment, Product
+from migrations import upgrade_database
+
+# Guards the hot lookups against full table scans.
+# Each query mirrors what a route issues; EXPLAIN QUERY PLAN must show an
+# index for all of them, both on a new database and on one upgraded from the
+# schema that predates the migrations.
+
+HOT_QUERIES = {
+    "list_available_products": select(Product).where(Product.is_archived == False).order_by(Product.id).limit(100),
+    "list_order_details": select(OrderDetail).where(OrderDetail.order_id == 1),
+    "list_my_donations": select(Donation).where(Donation.customer_id == 1),
+    "delete_campaign donations": select(Donation).where(Donation.campaign_id == 1),
+    "list_orders by customer": select(Order).where(Order.customer_id == 1),
+    "order payments": select(Payment).where(Payment.order_id == 1),
+    "load_cart": select(Cart).where(Cart.customer_id == 1),
+}
+
+# The tables touched by m0001 as they were before any migration existed
+LEGACY_SCHEMA = [
+    'CREATE TABLE "user" (email VARCHAR NOT NULL, name VARCHAR NOT NULL, address VARCHAR, '
+    "shipping_info VARCHAR, is_admin BOOLEAN NOT NULL, id INTEGER NOT NULL, "
+    "hashed_password VARCHAR NOT NULL, PRIMARY KEY (id))",
+    'CREATE UNIQUE INDEX ix_user_email ON "user" (email)',
+    "CREATE TABLE product (name VARCHAR NOT NULL, price FLOAT NOT NULL, description VARCHAR, "
+    "image VARCHAR, is_archived BOOLEAN NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (id))",
+    "CREATE TABLE cart (customer_id INTEGER NOT NULL, product_id INTEGER NOT NULL, "
+    "quantity INTEGER NOT NULL, date_added VARCHAR, id INTEGER NOT NULL, PRIMARY KEY (id))",
+    "CREATE TABLE donation (campaign_id INTEGER NOT NULL, amount FLOAT NOT NULL, "
+    "id INTEGER NOT NULL, PRIMARY KEY (id))",
+    'CREATE TABLE "order" (customer_id INTEGER NOT NULL, customer_name VARCHAR NOT NULL, '
+    "shipping_id INTEGER NOT NULL, status VARCHAR NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (id))",
+    "CREATE TABLE orderdetail (order_id INTEGER NOT NULL, product_id INTEGER NOT NULL, "
+    "product_name VARCHAR NOT NULL, unit_cost FLOAT NOT NULL, quantity INTEGER NOT NULL, "
+    "id INTEGER NOT NULL, PRIMARY KEY (id))",
+    "CREATE TABLE payment (order_id INTEGER NOT NULL, amount FLOAT NOT NULL, "
+    "payment_method VARCHAR NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (id))",
+]
+
+
+def explain(engine: Engine, statement) -> list[str]:
+    """Returns the EXPLAIN QUERY PLAN steps of a statement on SQLite."""
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+def find_full_scans(engine: Engine) -> dict[str, list[str]]:
+    """Maps each hot query that scans a whole table to its plan."""
+    scans = {}
+    for name, statement in HOT_QUERIES.items():
+        plan = explain(engine, statement)
+        if any(step.startswith("SCAN") and "USING" not in step for step in plan):
+            scans[name] = plan
+    return scans
+
+
+@pytest.fixture
+def new_engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_hot_queries_use_indexes_on_a_new_database(new_engine):
+    upgrade_database(new_engine)
+    assert find_full_scans(new_engine) == {}
+
+def test_hot_queries_use_indexes_after_upgrading_a_legacy_database(new_engine):
+    with new_engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+    upgrade_database(new_engine)
+    assert find_full_scans(new_engine) == {}
@@ -0,0 +1,15 @@
+PRODUCT = {
+    "name": "Woven <script>alert(1)</script> runner",
+    "description": "Handwoven & dyed <img src=x onerror=alert(1)> runner",
+    "price": 100,
+}
+
+
+def test_search_highlights_escape_product_text(client, admin_headers):
+    response = client.post("/products/", json=PRODUCT, headers=admin_headers)
+    assert response.status_code == 200
+
+    result = next(row for row in client.get("/products/search", params={"q": "runner"}).json() if row["id"] == response.json()["id"])
+    assert result["name_highlight"] == "Woven &lt;script&gt;alert(1)&lt;/script&gt; <mark>runner</mark>"
+    assert "<img" not in result["snippet"]
+    assert "<mark>runner</mark>" in result["snippet"]
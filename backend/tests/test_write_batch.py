@@ -0,0 +1,38 @@
+import pytest
+from sqlmodel import Session, select
+
+from database import engine
+from database_models import ShippingInfo
+from write_batch import GroupCommitter
+
+
+def add_address(address: str, fail: bool = False):
+    def record(session: Session) -> int:
+        shipping = ShippingInfo(shipping_type="Standard", shipping_cost=0, shipping_address=address)
+        session.add(shipping)
+        session.flush()
+        if fail:
+            raise ValueError("rejected")
+        return shipping.id
+    return record
+
+
+def test_a_failing_write_rolls_back_alone(client):
+    committer = GroupCommitter(window_ms=50)
+    # Queued before the thread starts, so all three land in one batch
+    futures = [
+        committer.submit(add_address("batch-first")),
+        committer.submit(add_address("batch-failing", fail=True)),
+        committer.submit(add_address("batch-last")),
+    ]
+    committer.start()
+    committer.stop()
+
+    first, failing, last = futures
+    with pytest.raises(ValueError, match="rejected"):
+        failing.result()
+    with Session(engine) as session:
+        saved = session.exec(select(ShippingInfo.id, ShippingInfo.shipping_address).where(
+            ShippingInfo.shipping_address.in_(["batch-first", "batch-failing", "batch-last"])
+        )).all()
+    assert sorted(saved) == sorted([(first.result(), "batch-first"), (last.result(), "batch-last")])
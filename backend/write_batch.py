@@ -0,0 +1,136 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional, TypeVar
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import engine
+
+# Optional group commit for the high-rate insert routes.
+# With WRITE_BATCHING=1, donations, orders and order details are not
+# committed by their own request. Each route hands its writes to a single
+# committer thread, which collects the writes arriving within
+# WRITE_BATCH_WINDOW_MS and commits them together, so one fsync covers the
+# whole batch and concurrent writers no longer queue on SQLite's write lock.
+# The thread runs each batch back to back on one connection, without
+# returning to the event loop between statements.
+#
+# Every write runs in its own SAVEPOINT, so one that fails (a missing
+# campaign, a constraint violation) is rolled back alone and its caller gets
+# its own error while the rest of the batch commits. Callers only return
+# once their batch has committed, so responses never report unsaved rows.
+#
+# Batches are per uvicorn worker; each worker runs its own committer.
+
+WRITE_BATCHING = os.getenv("WRITE_BATCHING", "0").lower() in ("1", "true")
+WRITE_BATCH_WINDOW_MS = float(os.getenv("WRITE_BATCH_WINDOW_MS", "5"))
+WRITE_BATCH_MAX_SIZE = int(os.getenv("WRITE_BATCH_MAX_SIZE", "200"))
+
+T = TypeVar("T")
+# Applies one request's writes to the session and returns what the route needs afterwards
+Write = Callable[[Session], T]
+
+
+class GroupCommitter:
+    """Background thread that commits the writes of concurrent requests in batches."""
+
+    def __init__(self, window_ms: float = WRITE_BATCH_WINDOW_MS, max_size: int = WRITE_BATCH_MAX_SIZE):
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="group-committer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Commits the writes already queued, then stops the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, write: Write[T]) -> Future:
+        """Queues `write`; the future resolves once its batch has committed."""
+        future = Future()
+        self._queue.put((write, future))
+        return future
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is None:
+                break
+            batch = [job]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_size:
+                try:
+                    job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            try:
+                self._commit(batch)
+            except Exception as exc:  # keep committing later batches
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _commit(self, batch: list):
+        outcomes = []
+        with Session(engine, expire_on_commit=False) as session:
+            if engine.dialect.name == "sqlite":
+                # The sqlite3 driver doesn't open a transaction for SAVEPOINT, so
+                # the first RELEASE would commit on its own. Take the write lock
+                # up front so the batch is one transaction that can't hit
+                # SQLITE_BUSY halfway through.
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for write, future in batch:
+                # Skips writes whose request was cancelled while queued
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with session.begin_nested():
+                        outcomes.append((future, write(session), None))
+                except Exception as exc:
+                    outcomes.append((future, None, exc))
+            try:
+                session.commit()
+            except Exception as exc:
+                # Nothing in the batch was saved
+                outcomes = [(future, None, error or exc) for future, _, error in outcomes]
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+group_committer = GroupCommitter()
+
+
+async def run_write(session: AsyncSession, write: Write[T]) -> T:
+    """
+    Applies `write` and commits it: through the group committer when
+    WRITE_BATCHING is on, otherwise directly on the request's session.
+    """
+    if WRITE_BATCHING:
+        # Give back the connection the request may hold (e.g. from the user
+        # lookup); waiting requests must not starve the committer of the pool
+        await session.close()
+        return await asyncio.wrap_future(group_committer.submit(write))
+    result = await session.run_sync(write)
+    await session.commit()
+    return result